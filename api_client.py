@@ -4,24 +4,33 @@ Polymarket API client with rate limiting and retry logic
 import requests
 import time
 from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
 from config import (
     GAMMA_API_BASE, CLOB_API_BASE,
     RATE_LIMIT_DELAY, RATE_LIMIT_BACKOFF,
-    MAX_RETRIES, TIMEOUT_SECONDS
+    MAX_RETRIES, TIMEOUT_SECONDS, HTTP_POOL_MAXSIZE
 )
+from json_utils import json_loads
 
 
 class PolymarketAPIClient:
     """API client for Polymarket with automatic rate limiting and retries"""
 
-    def __init__(self, auth_manager=None):
+    def __init__(self, auth_manager=None, session: Optional[requests.Session] = None):
         """
         Initialize API client.
 
         Args:
             auth_manager: Optional AuthManager instance for authenticated requests
-        """
-        self.session = requests.Session()
+            session: Optional requests.Session to share with other callers
+        """
+        if session is None:
+            session = requests.Session()
+            # Keep-alive pool; retries stay in _request_with_retry
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
         self.last_request_time = 0
         self.auth_manager = auth_manager
 
@@ -56,7 +65,8 @@ class PolymarketAPIClient:
                 )
 
                 if response.status_code == 200:
-                    return response.json()
+                    # Decode the raw bytes directly (orjson skips the str round trip)
+                    return json_loads(response.content)
                 elif response.status_code == 429:
                     backoff = RATE_LIMIT_BACKOFF[min(attempt, len(RATE_LIMIT_BACKOFF) - 1)]
                     print(f"Rate limited (429), waiting {backoff}s...")
@@ -75,7 +85,8 @@ class PolymarketAPIClient:
                 backoff = RATE_LIMIT_BACKOFF[min(attempt, len(RATE_LIMIT_BACKOFF) - 1)]
                 print(f"Request timeout (attempt {attempt + 1}/{MAX_RETRIES}), retrying...")
                 time.sleep(backoff)
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # ValueError: malformed JSON body, retried like a network error
                 backoff = RATE_LIMIT_BACKOFF[min(attempt, len(RATE_LIMIT_BACKOFF) - 1)]
                 print(f"Network error: {e}, retrying...")
                 time.sleep(backoff)
@@ -14,6 +14,9 @@ RATE_LIMIT_BACKOFF = [1, 2, 5, 10, 30]  # exponential backoff on 429 (seconds)
 MAX_RETRIES = 3
 TIMEOUT_SECONDS = 30
 
+# Connection Pooling
+HTTP_POOL_MAXSIZE = 16  # keep-alive connections per host
+
 # Crypto Keywords for Filtering
 CRYPTO_KEYWORDS = [
     'bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol',
@@ -38,15 +41,27 @@ MAX_POLL_INTERVAL = 60
 ORDERBOOK_DEPTH = 10  # Top N levels to display
 RECENT_TRADES_COUNT = 10
 
+# Chart Explorer Settings
+PRICE_HISTORY_CACHE_SIZE = 64  # Max (token, interval, fidelity) histories kept in memory
+
 # Data Paths
 DATA_DIR = "data"
 ARCHIVE_DIR = "archive"
 CACHE_FILE = f"{DATA_DIR}/crypto_markets_cache.csv"
+MARKET_TOKENS_CACHE_DIR = f"{DATA_DIR}/market_tokens"  # One JSON file per market
+MARKET_TOKENS_CACHE_TTL = 24 * 3600  # Refetch market metadata after 24h
 
 # Tick Database Settings
 TICK_DB_PATH = f"{DATA_DIR}/ticks.db"
-TICK_BATCH_COMMIT_SIZE = 100  # Commit every N trades
+TICK_BATCH_COMMIT_SIZE = 500  # Commit every N trades
+TICK_FLUSH_INTERVAL = 1.0  # ...or at least this often (seconds)
 TICK_METADATA_REFRESH_INTERVAL = 300  # Refresh market metadata every 5min
+TICK_DB_JOURNAL_MODE = "WAL"  # WAL avoids the rollback-journal fsync per commit
+TICK_DB_SYNCHRONOUS = "NORMAL"  # Safe with WAL; only a power loss can drop the last commits
+TICK_DB_CACHE_SIZE_KB = 64 * 1024  # SQLite page cache (64 MiB)
+TICK_DB_MMAP_SIZE = 1024 * 1024 * 1024  # Memory-mapped I/O window (1 GiB; address space, not heap)
+TICK_DB_CACHED_STATEMENTS = 256  # Prepared statements kept per connection
+TICK_WAL_CHECKPOINT_INTERVAL = 10000  # Truncate the WAL every N recorded trades
 
 # Historical Fetch Settings
 MAX_HISTORICAL_FETCH_PER_TOKEN = 10000
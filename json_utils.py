@@ -0,0 +1,19 @@
+"""
+JSON encoding/decoding shared by the API, price history and WebSocket clients
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON parsing/encoding when installed
+    orjson = None
+
+# Accepts str or bytes, so responses can be decoded without a str round trip
+json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def json_dumps_bytes(obj) -> bytes:
+    """Encode obj as UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
@@ -12,7 +12,7 @@ import sys
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from api_client import PolymarketAPIClient
-from websocket_client import MarketWebSocketClient
+from websocket_client import MarketWebSocketClient, TradeRecord
 from terminal_ui import TerminalUI
 from config import (
     DEFAULT_POLL_INTERVAL, MIN_POLL_INTERVAL,
@@ -151,28 +151,26 @@ class MarketMonitor:
             return False
         return True
 
-    def _on_ws_trade(self, trade: Dict):
+    def _on_ws_trade(self, trade: TradeRecord):
         """Callback for WebSocket trade events"""
-        asset_id = trade.get('asset_id', '')
+        asset_id = trade.asset_id
         
         if asset_id == self.token_up:
-            trade['outcome'] = 'UP'
+            outcome = 'UP'
         elif asset_id == self.token_down:
-            trade['outcome'] = 'DOWN'
+            outcome = 'DOWN'
         else:
-            trade['outcome'] = '?'
+            outcome = '?'
         
-        # Convert strings to floats
-        try:
-            trade['price'] = float(trade.get('price', 0))
-            trade['size'] = float(trade.get('size', 0))
-        except (ValueError, TypeError):
-            trade['price'] = 0.0
-            trade['size'] = 0.0
-        
-        # Update UI
+        # Update UI (price/size already arrive as floats from the WebSocket client)
         if self.ui:
-            self.ui.add_trade(trade)
+            self.ui.add_trade({
+                'timestamp': trade.timestamp,
+                'side': trade.side,
+                'outcome': outcome,
+                'price': trade.price,
+                'size': trade.size
+            })
 
     def _on_ws_book(self, book: Dict):
         """Callback for WebSocket orderbook events"""
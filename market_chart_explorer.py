@@ -7,17 +7,75 @@ Usage:
     python market_chart_explorer.py
 """
 
+import os
+import pickle
 import sys
-import csv
-from datetime import datetime
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from dateutil.tz import tzlocal
 
 # Chart rendering
 import plotext as plt
 
 from api_client import PolymarketAPIClient
 from price_history import fetch_price_history, get_market_tokens
-from config import CACHE_FILE
+from config import CACHE_FILE, PRICE_HISTORY_CACHE_SIZE
+
+# Volume display formats indexed by magnitude (0: units, 1: thousands, 2: millions)
+VOLUME_SCALES = np.array([1.0, 1_000.0, 1_000_000.0])
+VOLUME_FORMATS = ("${:.0f}", "${:.1f}K", "${:.1f}M")
+
+# Low-cardinality cache columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ('closed', 'outcome1', 'outcome2')
+
+
+def format_volumes(volumes: pd.Series) -> List[str]:
+    """Format a whole volume column at once (unparseable values show as $0)."""
+    vol = pd.to_numeric(volumes, errors='coerce').fillna(0).to_numpy(dtype=float)
+    magnitude = (vol >= 1_000).astype(np.intp) + (vol >= 1_000_000)
+    scaled = vol / VOLUME_SCALES[magnitude]
+    return [VOLUME_FORMATS[m].format(v) for m, v in zip(magnitude.tolist(), scaled.tolist())]
+
+
+def format_timestamps(timestamps: np.ndarray) -> List[str]:
+    """Format Unix timestamps (seconds) as local-time strings in one vectorized pass."""
+    local = pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(tzlocal())
+    return local.strftime('%Y-%m-%d %H:%M:%S').tolist()
+
+
+# (token_id, interval, fidelity) -> history, least recently used first
+_history_cache: Dict[Tuple[str, str, int], List[Dict]] = {}
+_history_cache_lock = threading.Lock()
+
+
+def fetch_price_history_cached(token_id: str, interval: str, fidelity: int = 1) -> List[Dict]:
+    """
+    LRU-cached wrapper around fetch_price_history for interactive browsing.
+
+    Empty (or failed) fetches are not cached, so they are retried next time.
+    Callers get their own list, but the point dicts are shared with the
+    cache and must not be modified.
+    """
+    key = (token_id, interval, fidelity)
+    with _history_cache_lock:
+        history = _history_cache.pop(key, None)
+        if history is not None:
+            _history_cache[key] = history  # Re-insert as most recently used
+            return list(history)
+
+    history = fetch_price_history(token_id, interval=interval, fidelity=fidelity)
+    if not history:
+        return []
+
+    with _history_cache_lock:
+        _history_cache[key] = history
+        if len(_history_cache) > PRICE_HISTORY_CACHE_SIZE:
+            del _history_cache[next(iter(_history_cache))]
+    return list(history)
 
 
 class MarketExplorer:
@@ -26,87 +84,127 @@ class MarketExplorer:
     def __init__(self):
         self.client = PolymarketAPIClient()
         self.markets = []
+        self.markets_by_id: Dict[str, Dict] = {}
+        self.markets_df = pd.DataFrame()
         self.selected_market = None
 
     def load_markets_from_cache(self) -> bool:
-        """Load markets from CSV cache."""
+        """Load markets from CSV cache (or its pickled, preprocessed copy if fresh)."""
+        if not self._load_markets_pickle():
+            try:
+                # Keep every column as text, matching what csv.DictReader produced
+                self.markets_df = pd.read_csv(CACHE_FILE, dtype=str, keep_default_na=False)
+            except (FileNotFoundError, pd.errors.EmptyDataError):
+                return False
+
+            # Few distinct values: string ops like .str.lower() run once per category
+            self.markets_df = self.markets_df.astype(
+                {col: 'category' for col in CATEGORICAL_COLUMNS if col in self.markets_df.columns}
+            )
+
+            # Normalize the status text once so filters and displays branch on a bool
+            # (a cache without the column counts every market as open)
+            if 'closed' in self.markets_df.columns:
+                self.markets_df['is_closed'] = self.markets_df['closed'].str.lower().eq('true').astype(bool)
+            else:
+                self.markets_df['is_closed'] = False
+
+            # Precompute display strings for the whole cache in one pass
+            volumes = self.markets_df.get('volume', pd.Series('0', index=self.markets_df.index))
+            self.markets_df['_vol_str'] = format_volumes(volumes)
+
+            self.markets = self.markets_df.to_dict('records')
+            self._save_markets_pickle()
+
+        # Rebuilt on every load, so the index never outlives the cache it came from
+        self.markets_by_id = {market.get('id'): market for market in self.markets}
+        return len(self.markets) > 0
+
+    def _load_markets_pickle(self) -> bool:
+        """Load the preprocessed markets if the pickle is at least as new as the CSV."""
+        pickle_path = f"{CACHE_FILE}.pkl"
         try:
-            with open(CACHE_FILE) as f:
-                reader = csv.DictReader(f)
-                self.markets = list(reader)
-            return len(self.markets) > 0
-        except FileNotFoundError:
+            if os.path.getmtime(pickle_path) < os.path.getmtime(CACHE_FILE):
+                return False
+            with open(pickle_path, 'rb') as f:
+                self.markets_df, self.markets = pickle.load(f)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError, pickle.UnpicklingError):
+            # Missing, truncated, or written by an incompatible pandas version
             return False
+        return True
 
-    def filter_markets(self, keyword: str = None, status: str = 'all', limit: int = None) -> List[Dict]:
-        """Filter markets by criteria."""
-        filtered = []
+    def _save_markets_pickle(self):
+        """Atomically write the preprocessed markets next to the CSV (best effort)."""
+        pickle_path = f"{CACHE_FILE}.pkl"
+        tmp_path = f"{pickle_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((self.markets_df, self.markets), f, protocol=5)
+            os.replace(tmp_path, pickle_path)
+        except (OSError, pickle.PicklingError):
+            # Don't leave a partial temp file behind on every failed run
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
 
-        for market in self.markets:
-            # Status filter
-            is_closed = market.get('closed', '').lower() == 'true'
-            if status == 'open' and is_closed:
-                continue
-            if status == 'closed' and not is_closed:
-                continue
+    def filter_markets(self, keyword: str = None, status: str = 'all', limit: int = None) -> pd.DataFrame:
+        """Filter markets by criteria."""
+        filtered = self.markets_df
 
-            # Keyword filter
-            if keyword:
-                question = market.get('question', '').lower()
-                if keyword.lower() not in question:
-                    continue
+        # Status filter
+        if status in ('open', 'closed'):
+            is_closed = filtered['is_closed']
+            filtered = filtered[~is_closed if status == 'open' else is_closed]
 
-            filtered.append(market)
+        # Keyword filter
+        if keyword:
+            mask = filtered['question'].str.lower().str.contains(keyword.lower(), regex=False)
+            filtered = filtered[mask]
 
-            if limit and len(filtered) >= limit:
-                break
+        if limit:
+            filtered = filtered.head(limit)
 
         return filtered
 
-    def display_markets(self, markets: List[Dict], page: int = 0, page_size: int = 50):
+    def display_markets(self, markets: pd.DataFrame, page: int = 0, page_size: int = 50) -> List[Dict]:
         """Display market list in a table with pagination."""
-        if not markets:
+        if markets.empty:
             print("\n❌ No markets found.")
             return []
 
         total_pages = (len(markets) - 1) // page_size + 1
         start_idx = page * page_size
         end_idx = min(start_idx + page_size, len(markets))
-        page_markets = markets[start_idx:end_idx]
-
-        print("\n" + "="*100)
-        print(f"Showing {start_idx + 1}-{end_idx} of {len(markets)} markets (Page {page + 1}/{total_pages})")
-        print("="*100)
-        print(f"{'#':<4} {'ID':<10} {'Question':<50} {'Volume':<12} {'Status':<8}")
-        print("-"*100)
-
-        for i, market in enumerate(page_markets, 1):
-            market_id = market.get('id', 'N/A')
-            question = market.get('question', 'N/A')
+        page_markets = markets.iloc[start_idx:end_idx]
+        rows = page_markets[['id', 'question', '_vol_str', 'is_closed']]
+
+        # Build the whole page first and write it to the terminal in one go
+        lines = [
+            "",
+            "="*100,
+            f"Showing {start_idx + 1}-{end_idx} of {len(markets)} markets (Page {page + 1}/{total_pages})",
+            "="*100,
+            f"{'#':<4} {'ID':<10} {'Question':<50} {'Volume':<12} {'Status':<8}",
+            "-"*100,
+        ]
+
+        for i, (market_id, question, vol_str, is_closed) in enumerate(rows.itertuples(index=False, name=None), 1):
             if len(question) > 47:
                 question = question[:47] + "..."
 
-            volume = market.get('volume', '0')
-            try:
-                vol_float = float(volume)
-                if vol_float >= 1000000:
-                    vol_str = f"${vol_float/1000000:.1f}M"
-                elif vol_float >= 1000:
-                    vol_str = f"${vol_float/1000:.1f}K"
-                else:
-                    vol_str = f"${vol_float:.0f}"
-            except:
-                vol_str = "$0"
-
-            status = "Closed" if market.get('closed', '').lower() == 'true' else "Open"
+            status = "Closed" if is_closed else "Open"
 
-            print(f"{i:<4} {market_id:<10} {question:<50} {vol_str:<12} {status:<8}")
+            lines.append(f"{i:<4} {market_id:<10} {question:<50} {vol_str:<12} {status:<8}")
 
-        print("="*100)
+        lines.append("="*100)
         if total_pages > 1:
-            print(f"Navigation: [N]ext page | [P]revious page | [S]elect market | [B]ack")
+            lines.append(f"Navigation: [N]ext page | [P]revious page | [S]elect market | [B]ack")
 
-        return page_markets
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+        return page_markets.to_dict('records')
 
     def select_market(self, markets: List[Dict]) -> Optional[Dict]:
         """Prompt user to select a market."""
@@ -129,22 +227,31 @@ class MarketExplorer:
 
     def display_market_details(self, market: Dict):
         """Display detailed market information."""
-        print("\n" + "="*80)
-        print("MARKET DETAILS")
-        print("="*80)
-        print(f"ID:       {market.get('id', 'N/A')}")
-        print(f"Question: {market.get('question', 'N/A')}")
-        print(f"Outcomes: {market.get('outcome1', 'N/A')} / {market.get('outcome2', 'N/A')}")
-        print(f"Volume:   ${float(market.get('volume', 0)):,.2f}")
-        print(f"Status:   {'Closed' if market.get('closed', '').lower() == 'true' else 'Open'}")
-        print(f"Created:  {market.get('createdAt', 'N/A')}")
+        lines = [
+            "",
+            "="*80,
+            "MARKET DETAILS",
+            "="*80,
+            f"ID:       {market.get('id', 'N/A')}",
+            f"Question: {market.get('question', 'N/A')}",
+            f"Outcomes: {market.get('outcome1', 'N/A')} / {market.get('outcome2', 'N/A')}",
+            f"Volume:   ${float(market.get('volume', 0)):,.2f}",
+            f"Status:   {'Closed' if market.get('is_closed') else 'Open'}",
+            f"Created:  {market.get('createdAt', 'N/A')}",
+        ]
 
         if market.get('closedTime'):
-            print(f"Closed:   {market.get('closedTime')}")
+            lines.append(f"Closed:   {market.get('closedTime')}")
+
+        lines += [
+            "",
+            f"Token 1 ({market.get('outcome1', 'N/A')}): {market.get('token1', 'N/A'):.30}...",
+            f"Token 2 ({market.get('outcome2', 'N/A')}): {market.get('token2', 'N/A'):.30}...",
+            "="*80,
+        ]
 
-        print(f"\nToken 1 ({market.get('outcome1', 'N/A')}): {market.get('token1', 'N/A')[:30]}...")
-        print(f"Token 2 ({market.get('outcome2', 'N/A')}): {market.get('token2', 'N/A')[:30]}...")
-        print("="*80)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def chart_price_history(self, market: Dict):
         """Fetch and chart price history for a market."""
@@ -184,8 +291,11 @@ class MarketExplorer:
         outcome1 = tokens.get('outcome_up', 'Outcome 1')
         outcome2 = tokens.get('outcome_down', 'Outcome 2')
 
-        history1 = fetch_price_history(tokens['token_up'], interval=interval, fidelity=1)
-        history2 = fetch_price_history(tokens['token_down'], interval=interval, fidelity=1)
+        # Both outcomes are independent requests - fetch them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future1 = executor.submit(fetch_price_history_cached, tokens['token_up'], interval, 1)
+            future2 = executor.submit(fetch_price_history_cached, tokens['token_down'], interval, 1)
+            history1, history2 = future1.result(), future2.result()
 
         if not history1 and not history2:
             print("\n❌ No price data available for this market")
@@ -217,7 +327,8 @@ class MarketExplorer:
         # Plot outcome 1 - Use solid line with markers
         if history1:
             # Convert timestamps to datetime strings for plotext
-            times1 = [datetime.fromtimestamp(p['t']).strftime('%Y-%m-%d %H:%M:%S') for p in history1]
+            t1 = np.fromiter((p['t'] for p in history1), dtype=np.int64, count=len(history1))
+            times1 = format_timestamps(t1)
             prices1 = [p['p'] for p in history1]
 
             plt.date_form('Y-m-d H:M:S')
@@ -234,7 +345,8 @@ class MarketExplorer:
 
         # Plot outcome 2 - Use dashed line with different markers
         if history2:
-            times2 = [datetime.fromtimestamp(p['t']).strftime('%Y-%m-%d %H:%M:%S') for p in history2]
+            t2 = np.fromiter((p['t'] for p in history2), dtype=np.int64, count=len(history2))
+            times2 = format_timestamps(t2)
             prices2 = [p['p'] for p in history2]
 
             if not has_data:  # Only set date_form once
@@ -294,7 +406,7 @@ class MarketExplorer:
             except KeyboardInterrupt:
                 break
 
-    def browse_markets_with_pagination(self, markets: List[Dict]):
+    def browse_markets_with_pagination(self, markets: pd.DataFrame):
         """Browse markets with pagination and selection."""
         page = 0
         total_pages = (len(markets) - 1) // 50 + 1
@@ -336,20 +448,28 @@ class MarketExplorer:
         filename = f"market_{market_id}_info.txt"
 
         try:
+            closed_line = (f"Closed:    {market.get('closedTime')}",) if market.get('closedTime') else ()
+            lines = (
+                "POLYMARKET MARKET INFORMATION",
+                "="*80,
+                "",
+                f"Market ID: {market.get('id', 'N/A')}",
+                f"Question:  {market.get('question', 'N/A')}",
+                f"Outcome 1: {market.get('outcome1', 'N/A')}",
+                f"Outcome 2: {market.get('outcome2', 'N/A')}",
+                f"Volume:    ${float(market.get('volume', 0)):,.2f}",
+                f"Status:    {'Closed' if market.get('is_closed') else 'Open'}",
+                f"Created:   {market.get('createdAt', 'N/A')}",
+                *closed_line,
+                "",
+                f"Token 1: {market.get('token1', 'N/A')}",
+                f"Token 2: {market.get('token2', 'N/A')}",
+            )
+
+            # Single write of the whole report instead of one write per line
+            report = "\n".join(lines) + "\n"
             with open(filename, 'w') as f:
-                f.write("POLYMARKET MARKET INFORMATION\n")
-                f.write("="*80 + "\n\n")
-                f.write(f"Market ID: {market.get('id', 'N/A')}\n")
-                f.write(f"Question:  {market.get('question', 'N/A')}\n")
-                f.write(f"Outcome 1: {market.get('outcome1', 'N/A')}\n")
-                f.write(f"Outcome 2: {market.get('outcome2', 'N/A')}\n")
-                f.write(f"Volume:    ${float(market.get('volume', 0)):,.2f}\n")
-                f.write(f"Status:    {'Closed' if market.get('closed', '').lower() == 'true' else 'Open'}\n")
-                f.write(f"Created:   {market.get('createdAt', 'N/A')}\n")
-                if market.get('closedTime'):
-                    f.write(f"Closed:    {market.get('closedTime')}\n")
-                f.write(f"\nToken 1: {market.get('token1', 'N/A')}\n")
-                f.write(f"Token 2: {market.get('token2', 'N/A')}\n")
+                f.write(report)
 
             print(f"\n✓ Exported to {filename}")
         except Exception as e:
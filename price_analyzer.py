@@ -7,10 +7,12 @@ Focused on data analysis, not terminal gimmicks.
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-from datetime import datetime
+from dateutil.tz import tzlocal
 from typing import List, Dict, Optional
 import csv
 
@@ -18,9 +20,23 @@ from price_history import fetch_price_history, get_market_tokens
 from config import CACHE_FILE
 
 
+def to_local_datetimes(timestamps: np.ndarray) -> pd.DatetimeIndex:
+    """Convert Unix timestamps (seconds) to naive local datetimes in one pass."""
+    return pd.to_datetime(timestamps, unit='s', utc=True).tz_convert(tzlocal()).tz_localize(None)
+
+
 def load_markets_cache() -> pd.DataFrame:
     """Load markets from cache into DataFrame."""
-    return pd.read_csv(CACHE_FILE)
+    # Categorical columns are parsed as strings, so closed stays 'True'/'False'
+    df = pd.read_csv(CACHE_FILE, dtype={
+        'closed': 'category',
+        'outcome1': 'category',
+        'outcome2': 'category'
+    })
+
+    # Normalize the status text once so filters branch on a bool
+    df['is_closed'] = df['closed'].str.lower().eq('true').astype(bool)
+    return df
 
 
 def fetch_market_price_data(market_id: str, interval: str = '1d', fidelity: int = None) -> Optional[pd.DataFrame]:
@@ -34,34 +50,29 @@ def fetch_market_price_data(market_id: str, interval: str = '1d', fidelity: int
         print(f"Error: Could not fetch token info for market {market_id}")
         return None
 
-    # Fetch both outcomes
-    history1 = fetch_price_history(tokens['token_up'], interval=interval, fidelity=fidelity)
-    history2 = fetch_price_history(tokens['token_down'], interval=interval, fidelity=fidelity)
+    # Fetch both outcomes concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future1 = executor.submit(fetch_price_history, tokens['token_up'], interval=interval, fidelity=fidelity)
+        future2 = executor.submit(fetch_price_history, tokens['token_down'], interval=interval, fidelity=fidelity)
+        history1, history2 = future1.result(), future2.result()
 
     if not history1 and not history2:
         print(f"Warning: No price data for market {market_id}")
         return None
 
-    # Build DataFrame
-    rows = []
+    # Build DataFrame column-wise (one vectorized timestamp conversion per outcome)
+    frames = []
 
-    if history1:
-        for point in history1:
-            rows.append({
-                'datetime': datetime.fromtimestamp(point['t']),
-                'outcome': tokens['outcome_up'],
-                'price': point['p']
-            })
-
-    if history2:
-        for point in history2:
-            rows.append({
-                'datetime': datetime.fromtimestamp(point['t']),
-                'outcome': tokens['outcome_down'],
-                'price': point['p']
-            })
+    for history, outcome in ((history1, tokens['outcome_up']), (history2, tokens['outcome_down'])):
+        if history:
+            ts = np.fromiter((point['t'] for point in history), dtype=np.int64, count=len(history))
+            frames.append(pd.DataFrame({
+                'datetime': to_local_datetimes(ts),
+                'outcome': outcome,
+                'price': [point['p'] for point in history]
+            }))
 
-    df = pd.DataFrame(rows)
+    df = pd.concat(frames, ignore_index=True)
     df['market_id'] = market_id
     df['question'] = tokens['question']
 
@@ -174,26 +185,35 @@ def analyze_market(df: pd.DataFrame) -> Dict:
 
 def print_analysis(stats: Dict):
     """Print analysis results."""
-    print("\n" + "="*80)
-    print(f"MARKET ANALYSIS")
-    print("="*80)
-    print(f"Question: {stats['question']}")
-    print(f"Market ID: {stats['market_id']}")
-    print(f"\nTime Range:")
-    print(f"  Start: {stats['time_range']['start']}")
-    print(f"  End: {stats['time_range']['end']}")
-    print(f"  Duration: {stats['time_range']['duration_hours']:.1f} hours")
-    print(f"  Total data points: {stats['data_points']}")
+    lines = [
+        "",
+        "="*80,
+        f"MARKET ANALYSIS",
+        "="*80,
+        f"Question: {stats['question']}",
+        f"Market ID: {stats['market_id']}",
+        f"\nTime Range:",
+        f"  Start: {stats['time_range']['start']}",
+        f"  End: {stats['time_range']['end']}",
+        f"  Duration: {stats['time_range']['duration_hours']:.1f} hours",
+        f"  Total data points: {stats['data_points']}",
+    ]
 
     for outcome, data in stats['outcomes'].items():
-        print(f"\n{outcome}:")
-        print(f"  Data points: {data['count']}")
-        print(f"  Range: ${data['min']:.4f} - ${data['max']:.4f}")
-        print(f"  Mean: ${data['mean']:.4f} ± ${data['std']:.4f}")
-        print(f"  Final: ${data['final']:.4f}")
-        print(f"  Change: {data['change_pct']:+.2f}%")
+        lines += [
+            f"\n{outcome}:",
+            f"  Data points: {data['count']}",
+            f"  Range: ${data['min']:.4f} - ${data['max']:.4f}",
+            f"  Mean: ${data['mean']:.4f} ± ${data['std']:.4f}",
+            f"  Final: ${data['final']:.4f}",
+            f"  Change: {data['change_pct']:+.2f}%",
+        ]
+
+    lines.append("="*80)
 
-    print("="*80)
+    # One write for the whole report
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def export_analysis(stats: Dict, output_file: str):
@@ -277,9 +297,9 @@ def cmd_search(args):
 
     # Filter by status
     if args.status == 'open':
-        markets_df = markets_df[markets_df['closed'].str.lower() == 'false']
+        markets_df = markets_df[~markets_df['is_closed']]
     elif args.status == 'closed':
-        markets_df = markets_df[markets_df['closed'].str.lower() == 'true']
+        markets_df = markets_df[markets_df['is_closed']]
 
     # Sort by volume
     markets_df['volume_float'] = pd.to_numeric(markets_df['volume'], errors='coerce')
@@ -292,7 +312,7 @@ def cmd_search(args):
 
     for idx, row in results.iterrows():
         print(f"{idx+1}. [{row['id']}] {row['question']}")
-        print(f"   Volume: ${float(row['volume']):,.2f} | Status: {'Closed' if row['closed'].lower() == 'true' else 'Open'}")
+        print(f"   Volume: ${float(row['volume']):,.2f} | Status: {'Closed' if row['is_closed'] else 'Open'}")
         print()
 
 
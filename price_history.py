@@ -20,15 +20,59 @@ Usage:
 """
 
 import argparse
+import atexit
+import heapq
+import os
 import sys
+import time
 import csv
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterator, List, Dict, Optional, Tuple
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from api_client import PolymarketAPIClient
-from config import CLOB_API_BASE
+from config import CLOB_API_BASE, MARKET_TOKENS_CACHE_DIR, MARKET_TOKENS_CACHE_TTL
+from json_utils import json_loads, orjson
+
+
+def _build_session() -> requests.Session:
+    """Create a pooled keep-alive session shared by all price-history requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# Reused across calls so repeated fetches skip the TCP/TLS handshake
+_SESSION = _build_session()
+atexit.register(_SESSION.close)
+
+_CLIENT: Optional[PolymarketAPIClient] = None
+
+
+def _get_client() -> PolymarketAPIClient:
+    """Shared Gamma API client, so market lookups reuse one connection pool."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = PolymarketAPIClient()
+        atexit.register(_CLIENT.session.close)
+    return _CLIENT
 
 
 def fetch_price_history(
@@ -71,7 +115,7 @@ def fetch_price_history(
     print(f"Parameters: {params}")
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = _SESSION.get(url, params=params, timeout=30)
 
         if response.status_code == 200:
             data = response.json()
@@ -86,24 +130,137 @@ def fetch_price_history(
         return []
 
 
-def get_market_tokens(market_id: str) -> Optional[Dict]:
-    """Get token IDs for a market."""
-    client = PolymarketAPIClient()
-    market = client.get_market_by_id(market_id)
+def fetch_price_histories(
+    token_ids: List[str],
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+    interval: Optional[str] = None,
+    fidelity: Optional[int] = None,
+    max_workers: int = 8
+) -> Dict[str, List[Dict]]:
+    """
+    Fetch price history for several tokens concurrently.
+
+    Requests are independent and share the pooled session, so wall time is
+    roughly one round trip per max_workers tokens instead of one per token.
+
+    Returns:
+        Dict mapping each token ID to its price points (see fetch_price_history)
+    """
+    unique_ids = list(dict.fromkeys(token_ids))
+    if not unique_ids:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_ids))) as executor:
+        futures = [
+            executor.submit(
+                fetch_price_history,
+                token_id,
+                start_ts=start_ts,
+                end_ts=end_ts,
+                interval=interval,
+                fidelity=fidelity
+            )
+            for token_id in unique_ids
+        ]
+        # Collect in request order so output stays deterministic
+        return {token_id: future.result() for token_id, future in zip(unique_ids, futures)}
+
+
+def _tokens_cache_path(market_id: str) -> Optional[str]:
+    """Disk cache path for a market, or None if the ID isn't safe as a filename."""
+    if not str(market_id).isalnum():
+        return None
+    return os.path.join(MARKET_TOKENS_CACHE_DIR, f"{market_id}.json")
+
+
+def _read_cached_tokens(market_id: str) -> Optional[Dict]:
+    """Read market tokens from disk if present and younger than the TTL."""
+    path = _tokens_cache_path(market_id)
+    if not path:
+        return None
+
+    try:
+        if time.time() - os.path.getmtime(path) > MARKET_TOKENS_CACHE_TTL:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cached_tokens(market_id: str, tokens: Dict):
+    """Atomically write market tokens to the disk cache (best effort)."""
+    path = _tokens_cache_path(market_id)
+    if not path:
+        return
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(MARKET_TOKENS_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump(tokens, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=256)
+def _cached_market_tokens(market_id: str) -> Dict:
+    """Resolve market tokens via disk cache, then API (memoized per process)."""
+    tokens = _read_cached_tokens(market_id)
+    if tokens is None:
+        tokens = _fetch_market_tokens(market_id)
+        if tokens is None:
+            # Exceptions are not memoized, so unknown markets are retried
+            raise LookupError(market_id)
+        _write_cached_tokens(market_id, tokens)
+    return tokens
+
+
+def get_market_tokens(market_id: str, use_cache: bool = True) -> Optional[Dict]:
+    """
+    Get token IDs for a market.
+
+    Market metadata doesn't change once created, so results are cached in
+    memory and on disk (see MARKET_TOKENS_CACHE_DIR).
+
+    Args:
+        market_id: Market ID
+        use_cache: Set False to force a fresh API lookup (refreshes the cache)
+
+    Returns:
+        Dict with market_id, question, token_up/down, outcome_up/down or None
+    """
+    if not use_cache:
+        tokens = _fetch_market_tokens(market_id)
+        if tokens:
+            _write_cached_tokens(market_id, tokens)
+            _cached_market_tokens.cache_clear()
+        return tokens
+
+    try:
+        # Copy so callers can't mutate the memoized entry
+        return dict(_cached_market_tokens(market_id))
+    except LookupError:
+        return None
+
+
+def _fetch_market_tokens(market_id: str) -> Optional[Dict]:
+    """Fetch token IDs for a market from the Gamma API."""
+    market = _get_client().get_market_by_id(market_id)
 
     if not market:
         return None
 
     # Parse tokens and outcomes
-    import json as json_lib
-
     clob_tokens = market.get('clobTokenIds', [])
     if isinstance(clob_tokens, str):
-        clob_tokens = json_lib.loads(clob_tokens)
+        clob_tokens = json_loads(clob_tokens)
 
     outcomes = market.get('outcomes', [])
     if isinstance(outcomes, str):
-        outcomes = json_lib.loads(outcomes)
+        outcomes = json_loads(outcomes)
 
     if len(clob_tokens) != 2 or len(outcomes) != 2:
         return None
@@ -130,18 +287,27 @@ def parse_date(date_str: str) -> int:
         return int(dt.timestamp())
 
 
+@lru_cache(maxsize=65536)
 def format_timestamp(ts: int) -> str:
-    """Convert Unix timestamp to ISO datetime."""
+    """Convert Unix timestamp to ISO datetime (memoized; timestamps repeat across outcomes)."""
     dt = datetime.fromtimestamp(ts, tz=timezone.utc)
     return dt.isoformat()
 
 
+def format_timestamps(history: List[Dict]) -> List[str]:
+    """Vectorized format_timestamp() over every point of a price history."""
+    ts = np.fromiter((point['t'] for point in history), dtype=np.int64, count=len(history))
+    iso = ts.astype('datetime64[s]').astype(str)
+    # Same text as datetime.isoformat() for UTC: append the explicit offset
+    return np.char.add(iso, '+00:00').tolist()
+
+
 def cmd_fetch(args):
     """Fetch and display price history."""
 
     # Get token ID(s)
     if args.market_id:
-        market_info = get_market_tokens(args.market_id)
+        market_info = get_market_tokens(args.market_id, use_cache=not args.no_cache)
 
         if not market_info:
             print(f"Error: Market {args.market_id} not found or invalid")
@@ -187,19 +353,23 @@ def cmd_fetch(args):
     print("="*70)
     print()
 
-    # Fetch history for each token
-    all_data = []
+    # Fetch history for all tokens concurrently (independent requests)
+    print(f"Fetching price history for {len(tokens)} token(s)...")
 
-    for token_id, outcome in tokens:
-        print(f"Fetching {outcome} price history...")
+    by_token = fetch_price_histories(
+        [token_id for token_id, _ in tokens],
+        start_ts=start_ts,
+        end_ts=end_ts,
+        interval=args.interval,
+        fidelity=args.fidelity
+    )
+    histories = [by_token[token_id] for token_id, _ in tokens]
 
-        history = fetch_price_history(
-            token_id,
-            start_ts=start_ts,
-            end_ts=end_ts,
-            interval=args.interval,
-            fidelity=args.fidelity
-        )
+    # Tokens that returned data: (token_id, outcome, time-ordered history)
+    fetched = []
+
+    for (token_id, outcome), history in zip(tokens, histories):
+        print(f"{outcome} price history:")
 
         if not history:
             print(f"  No data returned for {outcome}")
@@ -207,26 +377,18 @@ def cmd_fetch(args):
 
         print(f"  ✓ Got {len(history)} price points")
 
-        # Add to combined data
-        for point in history:
-            all_data.append({
-                'timestamp': point['t'],
-                'datetime': format_timestamp(point['t']),
-                'outcome': outcome,
-                'price': point['p'],
-                'token_id': token_id
-            })
-
         # Show sample
-        if history:
-            print(f"  Sample (first 5):")
-            for point in history[:5]:
-                dt = format_timestamp(point['t'])
-                print(f"    {dt}: {point['p']:.4f}")
+        print(f"  Sample (first 5):")
+        for point in history[:5]:
+            dt = format_timestamp(point['t'])
+            print(f"    {dt}: {point['p']:.4f}")
 
         print()
 
-    if not all_data:
+        # Timsort is linear on the already-ordered API response; exports merge these
+        fetched.append((token_id, outcome, sorted(history, key=itemgetter('t'))))
+
+    if not fetched:
         print("No price data retrieved.")
         return
 
@@ -234,54 +396,80 @@ def cmd_fetch(args):
     print("="*70)
     print("SUMMARY")
     print("="*70)
-    print(f"Total data points: {len(all_data)}")
+    print(f"Total data points: {sum(len(history) for _, _, history in fetched)}")
 
-    timestamps = [d['timestamp'] for d in all_data]
-    if timestamps:
-        print(f"Time range: {format_timestamp(min(timestamps))} to {format_timestamp(max(timestamps))}")
-        time_span = max(timestamps) - min(timestamps)
-        print(f"Duration: {time_span / 3600:.1f} hours ({time_span / 86400:.1f} days)")
+    first_ts = min(history[0]['t'] for _, _, history in fetched)
+    last_ts = max(history[-1]['t'] for _, _, history in fetched)
+    print(f"Time range: {format_timestamp(first_ts)} to {format_timestamp(last_ts)}")
+    time_span = last_ts - first_ts
+    print(f"Duration: {time_span / 3600:.1f} hours ({time_span / 86400:.1f} days)")
 
-    prices = [d['price'] for d in all_data]
-    if prices:
-        print(f"Price range: {min(prices):.4f} - {max(prices):.4f}")
+    prices = np.concatenate([
+        np.fromiter((point['p'] for point in history), dtype=np.float64, count=len(history))
+        for _, _, history in fetched
+    ])
+    print(f"Price range: {prices.min():.4f} - {prices.max():.4f}")
 
     print("="*70)
 
     # Export if requested
     if args.output:
-        export_to_csv(all_data, args.output, args.market_id)
+        export_to_csv(fetched, args.output, args.market_id)
         print(f"\n✓ Exported to {args.output}")
 
     # Export JSON if requested
     if args.json:
-        with open(args.json, 'w') as f:
-            json.dump(all_data, f, indent=2)
+        all_data = [
+            {
+                'timestamp': point['t'],
+                'datetime': dt,
+                'outcome': outcome,
+                'price': point['p'],
+                'token_id': token_id
+            }
+            for token_id, outcome, history in fetched
+            for point, dt in zip(history, format_timestamps(history))
+        ]
+        if orjson is not None:
+            with open(args.json, 'wb') as f:
+                f.write(orjson.dumps(all_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(args.json, 'w') as f:
+                json.dump(all_data, f, indent=2)
         print(f"✓ Exported to {args.json}")
 
 
-def export_to_csv(data: List[Dict], output_path: str, market_id: str = None):
-    """Export price history to CSV."""
-    with open(output_path, 'w', newline='') as f:
-        fieldnames = ['datetime', 'timestamp', 'outcome', 'price', 'token_id']
-        if market_id:
-            fieldnames.insert(0, 'market_id')
+def _history_rows(token_id: str, outcome: str, history: List[Dict],
+                  market_id: str = None) -> Iterator[Tuple]:
+    """Yield finished CSV rows for one token, optionally prefixed with market_id."""
+    prefix = (market_id,) if market_id else ()
+    for point, dt in zip(history, format_timestamps(history)):
+        yield prefix + (dt, point['t'], outcome, point['p'], token_id)
 
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
 
-        for row in sorted(data, key=lambda x: x['timestamp']):
-            out_row = {
-                'datetime': row['datetime'],
-                'timestamp': row['timestamp'],
-                'outcome': row['outcome'],
-                'price': row['price'],
-                'token_id': row['token_id']
-            }
-            if market_id:
-                out_row['market_id'] = market_id
+def export_to_csv(histories: List[Tuple[str, str, List[Dict]]], output_path: str, market_id: str = None):
+    """
+    Stream price histories to CSV ordered by timestamp.
+
+    Args:
+        histories: (token_id, outcome, history) tuples, each history sorted by 't'
+        output_path: Path to output CSV file
+        market_id: Optional market ID column value
+    """
+    header = ['datetime', 'timestamp', 'outcome', 'price', 'token_id']
+    if market_id:
+        header.insert(0, 'market_id')
 
-            writer.writerow(out_row)
+    streams = [
+        _history_rows(token_id, outcome, history, market_id)
+        for token_id, outcome, history in histories
+    ]
+
+    with open(output_path, 'w', newline='', buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        # heapq.merge is stable, so ties keep token order like a full sort would
+        writer.writerows(heapq.merge(*streams, key=itemgetter(header.index('timestamp'))))
 
 
 def main():
@@ -324,6 +512,10 @@ Interval options: 1m, 1h, 6h, 1d, 1w, max
     # Resolution
     parser.add_argument('--fidelity', type=int, help='Resolution in minutes')
 
+    # Caching
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Refetch market metadata instead of using the local cache')
+
     # Output
     parser.add_argument('--output', help='Export to CSV file')
     parser.add_argument('--json', help='Export to JSON file')
@@ -4,9 +4,12 @@ Rich Terminal UI for Polymarket Monitor
 
 Beautiful, live-updating terminal interface using the Rich library.
 """
+import threading
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
-from collections import deque
+
+import numpy as np
 
 try:
     from rich.console import Console, Group
@@ -24,6 +27,15 @@ except ImportError:
     raise
 
 
+# Maximum redraws per second (updates in between are coalesced)
+REFRESH_PER_SECOND = 4
+
+# Orderbook levels shown per side
+ORDERBOOK_DEPTH = 5
+
+# Width of the per-outcome price bars
+PRICE_BAR_WIDTH = 18
+
 # Color scheme
 COLORS = {
     'up': 'green',
@@ -37,6 +49,50 @@ COLORS = {
     'sell': 'red',
 }
 
+# Preparsed styles, so render paths don't parse style strings every frame
+STYLE_BOLD = Style(bold=True)
+STYLE_DIM = Style(dim=True)
+STYLE_DIM_ITALIC = Style(dim=True, italic=True)
+STYLE_WHITE = Style(color="white")
+STYLE_DIM_WHITE = Style(color="white", dim=True)
+STYLE_BOLD_WHITE = Style(color="white", bold=True)
+STYLE_GREEN = Style(color="green")
+STYLE_RED = Style(color="red")
+STYLE_BOLD_GREEN = Style(color="green", bold=True)
+STYLE_BOLD_RED = Style(color="red", bold=True)
+STYLE_BOLD_YELLOW = Style(color="yellow", bold=True)
+
+
+def _levels_to_arrays(levels: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert [{'price': ..., 'size': ...}, ...] into parallel price/size arrays"""
+    count = len(levels)
+    px = np.fromiter((level['price'] for level in levels), dtype=np.float64, count=count)
+    sz = np.fromiter((level['size'] for level in levels), dtype=np.float64, count=count)
+    return px, sz
+
+
+def _best_levels(px: np.ndarray, sz: np.ndarray, highest: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """Select the ORDERBOOK_DEPTH best levels (highest bids / lowest asks), best first"""
+    key = -px if highest else px
+    if len(key) > ORDERBOOK_DEPTH:
+        idx = np.argpartition(key, ORDERBOOK_DEPTH)[:ORDERBOOK_DEPTH]
+    else:
+        idx = np.arange(len(key))
+    idx = idx[np.argsort(key[idx], kind='stable')]
+    return px[idx], sz[idx]
+
+
+@lru_cache(maxsize=None)
+def _price_bars(color: str) -> Tuple[Text, ...]:
+    """All possible price bars for a color, indexed by filled width"""
+    bars = []
+    for filled in range(PRICE_BAR_WIDTH + 1):
+        bar_text = Text()
+        bar_text.append("█" * filled, style=color)
+        bar_text.append("░" * (PRICE_BAR_WIDTH - filled), style=STYLE_DIM)
+        bars.append(bar_text)
+    return tuple(bars)
+
 
 class TerminalUI:
     """Rich-based terminal UI for market monitoring"""
@@ -54,30 +110,66 @@ class TerminalUI:
         self.down_change: Optional[float] = None
         self.spread: float = 0.0
         
-        self.orderbook_up: Dict = {'bids': [], 'asks': []}
-        self.orderbook_down: Dict = {'bids': [], 'asks': []}
-        
-        self.trades: deque = deque(maxlen=max_trades)
+        # Orderbooks are kept as parallel arrays: bid_px, bid_sz, ask_px, ask_sz
+        empty = np.empty(0, dtype=np.float64)
+        self.orderbook_up: Dict[str, np.ndarray] = dict.fromkeys(('bid_px', 'bid_sz', 'ask_px', 'ask_sz'), empty)
+        self.orderbook_down: Dict[str, np.ndarray] = dict.fromkeys(('bid_px', 'bid_sz', 'ask_px', 'ask_sz'), empty)
+        # Displayed levels (UP best bids, DOWN best asks) and their values
+        self._ob_bids: Tuple[np.ndarray, np.ndarray] = (empty, empty)
+        self._ob_asks: Tuple[np.ndarray, np.ndarray] = (empty, empty)
+        self._ob_bid_total: float = 0.0
+        self._ob_ask_total: float = 0.0
+        
+        # Trades are formatted once on arrival into a fixed-size ring of rows;
+        # _trade_head is the slot the next trade will overwrite
+        self._trade_ring: List[Optional[Tuple]] = [None] * max_trades
+        self._trade_head: int = 0
         self.trade_count: int = 0
         self.total_volume: float = 0.0
         
         self.ws_connected: bool = False
         self.last_update: Optional[datetime] = None
         self.events_received: int = 0
+        
+        # Mutators only set the dirty flag; the refresh thread rebuilds the
+        # layout at most REFRESH_PER_SECOND times per second
+        self._dirty = threading.Event()
+        self._stopped = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+        
+        # Layout tree is static; only stale sections get new panels
+        self._layout = self._create_layout()
+        self._section_builders = {
+            'header': self._build_header,
+            'prices': self._build_prices_panel,
+            'orderbook': self._build_orderbook_panel,
+            'visual': self._build_visual_panel,
+            'trades': self._build_trades_panel,
+            'footer': self._build_footer,
+        }
+        self._sections_lock = threading.Lock()
+        self._stale_sections = set(self._section_builders)
     
     def start(self):
         """Start the live display"""
         self.live = Live(
             self._build_layout(),
             console=self.console,
-            refresh_per_second=4,
-            screen=True,  # Use alternate screen buffer
+            auto_refresh=False,  # Redraws are driven by _refresh_loop
+            screen=True,  # Alternate screen; Live repaints whole frames either way
             transient=False
         )
-        self.live.start()
+        self.live.start(refresh=True)
+        
+        self._stopped.clear()
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresh_thread.start()
     
     def stop(self):
         """Stop the live display"""
+        self._stopped.set()
+        if self._refresh_thread and self._refresh_thread is not threading.current_thread():
+            self._refresh_thread.join(timeout=1)
         if self.live:
             self.live.stop()
     
@@ -91,41 +183,77 @@ class TerminalUI:
         self.down_change = down_change
         self.spread = abs(up_price - down_price)
         self.last_update = datetime.now(timezone.utc)
-        self._refresh()
+        self._mark_dirty('header', 'prices', 'visual')
     
     def update_orderbook(self, token: str, bids: List[Dict], asks: List[Dict]):
-        """Update orderbook data"""
+        """Update orderbook data (levels must already hold float price/size)"""
+        bid_px, bid_sz = _levels_to_arrays(bids)
+        ask_px, ask_sz = _levels_to_arrays(asks)
+        book = {'bid_px': bid_px, 'bid_sz': bid_sz, 'ask_px': ask_px, 'ask_sz': ask_sz}
+        
         if token == 'up':
-            self.orderbook_up = {'bids': bids, 'asks': asks}
+            self.orderbook_up = book
+            self._ob_bids = _best_levels(bid_px, bid_sz, highest=True)
+            self._ob_bid_total = float(self._ob_bids[0] @ self._ob_bids[1])
         else:
-            self.orderbook_down = {'bids': bids, 'asks': asks}
-        self._refresh()
+            self.orderbook_down = book
+            self._ob_asks = _best_levels(ask_px, ask_sz, highest=False)
+            self._ob_ask_total = float(self._ob_asks[0] @ self._ob_asks[1])
+        self._mark_dirty('orderbook')
     
     def add_trade(self, trade: Dict):
         """Add a new trade"""
-        self.trades.appendleft(trade)
-        self.trade_count += 1
-        price = float(trade.get('price', 0))
-        size = float(trade.get('size', 0))
-        self.total_volume += price * size
-        self._refresh()
+        self.add_trades([trade])
+    
+    def add_trades(self, trades: List[Dict]):
+        """Add a batch of trades (oldest first) with a single redraw
+        
+        Trades must already carry numeric 'price' and 'size' values
+        (live_monitor casts them when the websocket event arrives).
+        """
+        ring = self._trade_ring
+        head = self._trade_head
+        batch_volume = 0.0
+        for trade in trades:
+            price = trade['price']
+            size = trade['size']
+            if ring:  # max_trades=0 keeps no rows, only the totals
+                ring[head] = self._format_trade_row(trade, price, size)
+                head = (head + 1) % self.max_trades
+            batch_volume += price * size
+        
+        self._trade_head = head
+        self.trade_count += len(trades)
+        self.total_volume += batch_volume
+        self._mark_dirty('trades', 'footer')
     
     def set_ws_status(self, connected: bool):
         """Update WebSocket connection status"""
         self.ws_connected = connected
-        self._refresh()
+        self._mark_dirty('header', 'footer')
     
     def increment_events(self):
         """Increment event counter (for stats)"""
         self.events_received += 1
+        # Shown with the next redraw; events alone don't trigger one
+        with self._sections_lock:
+            self._stale_sections.add('footer')
     
-    def _refresh(self):
-        """Refresh the display"""
-        if self.live:
-            self.live.update(self._build_layout())
+    def _refresh_loop(self):
+        """Redraw when dirty, no more than REFRESH_PER_SECOND times per second"""
+        interval = 1 / REFRESH_PER_SECOND
+        while not self._stopped.is_set():
+            if self._dirty.wait(interval):
+                self._dirty.clear()
+                if self.live:
+                    # Live already holds self._layout; just patch and repaint
+                    self._build_layout()
+                    self.live.refresh()
+                # Coalesce any updates arriving during the rest of this frame
+                self._stopped.wait(interval)
     
-    def _build_layout(self) -> Layout:
-        """Build the full layout"""
+    def _create_layout(self) -> Layout:
+        """Create the static layout skeleton (built once, contents updated in place)"""
         layout = Layout()
         
         layout.split_column(
@@ -149,28 +277,71 @@ class TerminalUI:
             Layout(name="trades")
         )
         
-        # Populate sections
-        layout["header"].update(self._build_header())
-        layout["prices"].update(self._build_prices_panel())
-        layout["orderbook"].update(self._build_orderbook_panel())
-        layout["visual"].update(self._build_visual_panel())
-        layout["trades"].update(self._build_trades_panel())
-        layout["footer"].update(self._build_footer())
-        
         return layout
     
+    def _mark_dirty(self, *sections: str):
+        """Flag sections for rebuild and wake the refresh thread"""
+        with self._sections_lock:
+            self._stale_sections.update(sections)
+        self._dirty.set()
+    
+    def _build_layout(self) -> Layout:
+        """Rebuild only the sections whose data changed since the last frame"""
+        with self._sections_lock:
+            stale = self._stale_sections
+            self._stale_sections = set()
+        
+        for name in stale:
+            self._layout[name].update(self._section_builders[name]())
+        
+        return self._layout
+    
+    def _format_trade_row(self, trade: Dict, price: float, size: float) -> Tuple:
+        """Format a trade into a ready-to-render table row"""
+        # Parse timestamp
+        ts = trade.get('timestamp', '')
+        if ts:
+            try:
+                dt = datetime.fromtimestamp(int(ts) / 1000, tz=timezone.utc)
+                time_str = dt.strftime('%H:%M:%S')
+            except:
+                time_str = "?"
+        else:
+            time_str = "?"
+        
+        side = trade.get('side', '?')
+        side_style = STYLE_BOLD_GREEN if side == "BUY" else STYLE_BOLD_RED
+        
+        outcome = trade.get('outcome', '?')
+        outcome_style = STYLE_GREEN if outcome == "UP" else STYLE_RED
+        
+        value = price * size
+        
+        return (
+            time_str,
+            Text(side[:1], style=side_style),
+            Text(outcome, style=outcome_style),
+            f"${price:.4f}",
+            f"{size:,.1f}",
+            f"${value:,.2f}"
+        )
+    
     def _build_header(self) -> Panel:
         """Build header panel"""
-        ws_status = "[green]● LIVE[/]" if self.ws_connected else "[red]● OFFLINE[/]"
+        if self.ws_connected:
+            ws_status, ws_style = "● LIVE", STYLE_GREEN
+        else:
+            ws_status, ws_style = "● OFFLINE", STYLE_RED
         
         time_str = ""
         if self.last_update:
             time_str = self.last_update.strftime('%H:%M:%S UTC')
         
         header_text = Text()
-        header_text.append(f"  {self.market_name}", style="bold white")
-        header_text.append(f"  │  {ws_status}", style="white")
-        header_text.append(f"  │  {time_str}", style="dim white")
+        header_text.append(f"  {self.market_name}", style=STYLE_BOLD_WHITE)
+        header_text.append("  │  ", style=STYLE_WHITE)
+        header_text.append(ws_status, style=ws_style)
+        header_text.append(f"  │  {time_str}", style=STYLE_DIM_WHITE)
         
         return Panel(
             Align.left(header_text),
@@ -181,53 +352,53 @@ class TerminalUI:
     def _build_prices_panel(self) -> Panel:
         """Build prices panel with visual indicators"""
         table = Table(show_header=False, box=None, padding=(0, 1))
-        table.add_column("Label", style="bold")
+        table.add_column("Label", style=STYLE_BOLD)
         table.add_column("Price", justify="right")
         table.add_column("Change", justify="right")
         table.add_column("Bar", width=20)
         
         # UP price row
         up_change_str = ""
-        up_style = "green"
+        up_style = STYLE_GREEN
         if self.up_change is not None:
             if self.up_change > 0:
                 up_change_str = f"▲ +{self.up_change:.2f}%"
-                up_style = "green"
+                up_style = STYLE_GREEN
             elif self.up_change < 0:
                 up_change_str = f"▼ {self.up_change:.2f}%"
-                up_style = "red"
+                up_style = STYLE_RED
             else:
                 up_change_str = "─ 0.00%"
-                up_style = "dim"
+                up_style = STYLE_DIM
         
         up_bar = self._make_price_bar(self.up_price, "green")
         
         table.add_row(
-            Text("UP", style="bold green"),
-            Text(f"${self.up_price:.4f}", style="bold white"),
+            Text("UP", style=STYLE_BOLD_GREEN),
+            Text(f"${self.up_price:.4f}", style=STYLE_BOLD_WHITE),
             Text(up_change_str, style=up_style),
             up_bar
         )
         
         # DOWN price row
         down_change_str = ""
-        down_style = "red"
+        down_style = STYLE_RED
         if self.down_change is not None:
             if self.down_change > 0:
                 down_change_str = f"▲ +{self.down_change:.2f}%"
-                down_style = "green"
+                down_style = STYLE_GREEN
             elif self.down_change < 0:
                 down_change_str = f"▼ {self.down_change:.2f}%"
-                down_style = "red"
+                down_style = STYLE_RED
             else:
                 down_change_str = "─ 0.00%"
-                down_style = "dim"
+                down_style = STYLE_DIM
         
         down_bar = self._make_price_bar(self.down_price, "red")
         
         table.add_row(
-            Text("DOWN", style="bold red"),
-            Text(f"${self.down_price:.4f}", style="bold white"),
+            Text("DOWN", style=STYLE_BOLD_RED),
+            Text(f"${self.down_price:.4f}", style=STYLE_BOLD_WHITE),
             Text(down_change_str, style=down_style),
             down_bar
         )
@@ -235,9 +406,9 @@ class TerminalUI:
         # Spread row
         spread_pct = (self.spread / self.up_price * 100) if self.up_price > 0 else 0
         table.add_row(
-            Text("SPREAD", style="dim"),
-            Text(f"${self.spread:.4f}", style="dim"),
-            Text(f"({spread_pct:.1f}%)", style="dim"),
+            Text("SPREAD", style=STYLE_DIM),
+            Text(f"${self.spread:.4f}", style=STYLE_DIM),
+            Text(f"({spread_pct:.1f}%)", style=STYLE_DIM),
             Text("")
         )
         
@@ -250,14 +421,8 @@ class TerminalUI:
     
     def _make_price_bar(self, price: float, color: str) -> Text:
         """Create a visual price bar"""
-        bar_width = 18
-        filled = int(price * bar_width)
-        empty = bar_width - filled
-        
-        bar_text = Text()
-        bar_text.append("█" * filled, style=color)
-        bar_text.append("░" * empty, style="dim")
-        return bar_text
+        filled = min(PRICE_BAR_WIDTH, max(0, int(price * PRICE_BAR_WIDTH)))
+        return _price_bars(color)[filled]
     
     def _build_visual_panel(self) -> Panel:
         """Build visual representation panel"""
@@ -275,13 +440,13 @@ class TerminalUI:
         
         visual = Text()
         visual.append("\n")
-        visual.append(f"  UP {up_pct:.1f}%".ljust(12), style="bold green")
+        visual.append(f"  UP {up_pct:.1f}%".ljust(12), style=STYLE_BOLD_GREEN)
         visual.append(" " * 16)
-        visual.append(f"{down_pct:.1f}% DOWN".rjust(12), style="bold red")
+        visual.append(f"{down_pct:.1f}% DOWN".rjust(12), style=STYLE_BOLD_RED)
         visual.append("\n\n")
         visual.append("  ")
-        visual.append("█" * up_width, style="green")
-        visual.append("█" * down_width, style="red")
+        visual.append("█" * up_width, style=STYLE_GREEN)
+        visual.append("█" * down_width, style=STYLE_RED)
         visual.append("\n")
         
         # Add implied probability interpretation
@@ -289,19 +454,19 @@ class TerminalUI:
         if self.up_price > self.down_price:
             leader = "UP"
             confidence = up_pct
-            style = "green"
+            style = STYLE_BOLD_GREEN
         elif self.down_price > self.up_price:
             leader = "DOWN"
             confidence = down_pct
-            style = "red"
+            style = STYLE_BOLD_RED
         else:
             leader = "TIED"
             confidence = 50
-            style = "yellow"
+            style = STYLE_BOLD_YELLOW
         
-        visual.append(f"  Market favors: ", style="dim")
-        visual.append(f"{leader}", style=f"bold {style}")
-        visual.append(f" ({confidence:.1f}% implied probability)", style="dim")
+        visual.append(f"  Market favors: ", style=STYLE_DIM)
+        visual.append(f"{leader}", style=style)
+        visual.append(f" ({confidence:.1f}% implied probability)", style=STYLE_DIM)
         
         return Panel(
             visual,
@@ -313,16 +478,16 @@ class TerminalUI:
     def _build_orderbook_panel(self) -> Panel:
         """Build orderbook panel"""
         table = Table(show_header=True, box=box.SIMPLE, padding=(0, 1))
-        table.add_column("Price", justify="right", style="green")
+        table.add_column("Price", justify="right", style=STYLE_GREEN)
         table.add_column("Size", justify="right")
-        table.add_column("│", justify="center", style="dim")
-        table.add_column("Price", justify="right", style="red")
+        table.add_column("│", justify="center", style=STYLE_DIM)
+        table.add_column("Price", justify="right", style=STYLE_RED)
         table.add_column("Size", justify="right")
         
-        bids = self.orderbook_up.get('bids', [])[:5]
-        asks = self.orderbook_down.get('asks', [])[:5]
+        bid_px, bid_sz = self._ob_bids
+        ask_px, ask_sz = self._ob_asks
         
-        max_rows = max(len(bids), len(asks), 1)
+        max_rows = max(len(bid_px), len(ask_px), 1)
         
         for i in range(max_rows):
             bid_price = ""
@@ -330,25 +495,22 @@ class TerminalUI:
             ask_price = ""
             ask_size = ""
             
-            if i < len(bids):
-                bid_price = f"${bids[i].get('price', 0):.4f}"
-                bid_size = f"{bids[i].get('size', 0):,.0f}"
+            if i < len(bid_px):
+                bid_price = f"${bid_px[i]:.4f}"
+                bid_size = f"{bid_sz[i]:,.0f}"
             
-            if i < len(asks):
-                ask_price = f"${asks[i].get('price', 0):.4f}"
-                ask_size = f"{asks[i].get('size', 0):,.0f}"
+            if i < len(ask_px):
+                ask_price = f"${ask_px[i]:.4f}"
+                ask_size = f"{ask_sz[i]:,.0f}"
             
             table.add_row(bid_price, bid_size, "│", ask_price, ask_size)
         
-        # Calculate totals
-        bid_total = sum(b.get('price', 0) * b.get('size', 0) for b in bids)
-        ask_total = sum(a.get('price', 0) * a.get('size', 0) for a in asks)
-        
-        table.add_row("", "", "", "", "", style="dim")
+        # Totals are maintained by update_orderbook
+        table.add_row("", "", "", "", "", style=STYLE_DIM)
         table.add_row(
-            "[dim]Total:[/]", f"[dim]${bid_total:,.0f}[/]",
+            "[dim]Total:[/]", f"[dim]${self._ob_bid_total:,.0f}[/]",
             "",
-            "[dim]Total:[/]", f"[dim]${ask_total:,.0f}[/]"
+            "[dim]Total:[/]", f"[dim]${self._ob_ask_total:,.0f}[/]"
         )
         
         return Panel(
@@ -360,8 +522,8 @@ class TerminalUI:
     
     def _build_trades_panel(self) -> Panel:
         """Build recent trades panel"""
-        if not self.trades:
-            content = Text("\n  Waiting for trades...\n", style="dim italic")
+        if not self.trade_count:
+            content = Text("\n  Waiting for trades...\n", style=STYLE_DIM_ITALIC)
             return Panel(
                 content,
                 title="[bold]RECENT TRADES[/]",
@@ -370,43 +532,21 @@ class TerminalUI:
             )
         
         table = Table(show_header=True, box=None, padding=(0, 1))
-        table.add_column("Time", style="dim", width=8)
+        table.add_column("Time", style=STYLE_DIM, width=8)
         table.add_column("Side", width=4)
         table.add_column("Token", width=5)
         table.add_column("Price", justify="right", width=8)
         table.add_column("Size", justify="right", width=8)
         table.add_column("Value", justify="right", width=10)
         
-        for trade in list(self.trades)[:self.max_trades]:
-            # Parse timestamp
-            ts = trade.get('timestamp', '')
-            if ts:
-                try:
-                    dt = datetime.fromtimestamp(int(ts) / 1000, tz=timezone.utc)
-                    time_str = dt.strftime('%H:%M:%S')
-                except:
-                    time_str = "?"
-            else:
-                time_str = "?"
-            
-            side = trade.get('side', '?')
-            side_style = "green" if side == "BUY" else "red"
-            
-            outcome = trade.get('outcome', '?')
-            outcome_style = "green" if outcome == "UP" else "red"
-            
-            price = float(trade.get('price', 0))
-            size = float(trade.get('size', 0))
-            value = price * size
-            
-            table.add_row(
-                time_str,
-                Text(side[:1], style=f"bold {side_style}"),
-                Text(outcome, style=outcome_style),
-                f"${price:.4f}",
-                f"{size:,.1f}",
-                f"${value:,.2f}"
-            )
+        # Walk the ring newest first
+        ring = self._trade_ring
+        head = self._trade_head
+        for i in range(1, self.max_trades + 1):
+            row = ring[(head - i) % self.max_trades]
+            if row is None:
+                break
+            table.add_row(*row)
         
         return Panel(
             table,
@@ -418,19 +558,19 @@ class TerminalUI:
     def _build_footer(self) -> Panel:
         """Build footer panel"""
         footer = Text()
-        footer.append("  [Ctrl+C] Exit", style="dim")
-        footer.append("  │  ", style="dim")
-        footer.append(f"Events: {self.events_received}", style="dim")
-        footer.append("  │  ", style="dim")
-        footer.append(f"Trades: {self.trade_count}", style="dim")
-        footer.append("  │  ", style="dim")
+        footer.append("  [Ctrl+C] Exit", style=STYLE_DIM)
+        footer.append("  │  ", style=STYLE_DIM)
+        footer.append(f"Events: {self.events_received}", style=STYLE_DIM)
+        footer.append("  │  ", style=STYLE_DIM)
+        footer.append(f"Trades: {self.trade_count}", style=STYLE_DIM)
+        footer.append("  │  ", style=STYLE_DIM)
         
         if self.ws_connected:
-            footer.append("WebSocket: ", style="dim")
-            footer.append("Connected", style="green")
+            footer.append("WebSocket: ", style=STYLE_DIM)
+            footer.append("Connected", style=STYLE_GREEN)
         else:
-            footer.append("WebSocket: ", style="dim")
-            footer.append("Disconnected", style="red")
+            footer.append("WebSocket: ", style=STYLE_DIM)
+            footer.append("Disconnected", style=STYLE_RED)
         
         return Panel(footer, box=box.SIMPLE)
 
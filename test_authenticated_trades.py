@@ -17,14 +17,31 @@ Usage:
 
     # Test with more trades
     python test_authenticated_trades.py --limit 500
+
+    # Show full tracebacks on errors
+    python test_authenticated_trades.py --verbose
 """
 
 import argparse
+import sys
+import traceback
 from datetime import datetime
+from operator import itemgetter
+import numpy as np
 from api_client import PolymarketAPIClient
+from time_utils import parse_trade_ts
 from auth_manager import AuthManager
 
 
+# Fields shown for each sample trade (all present in /trades responses)
+_SAMPLE_FIELDS = itemgetter('timestamp', 'price', 'size', 'side')
+
+# Sample table layout, bound once instead of re-parsing format specs per row
+_SAMPLE_HEADER = "{:<25} {:<12} {:<15} {:<8}".format('Timestamp', 'Price', 'Size', 'Side')
+_format_sample_row = "{:<25} {:<12} {:<15.2f} {:<8}".format
+_RULE = "-" * 70
+
+
 def test_authentication():
     """Test if authentication credentials are configured."""
     print("="*70)
@@ -57,7 +74,7 @@ def test_authentication():
         return False
 
 
-def test_trade_fetch(token_id: str, limit: int = 100):
+def test_trade_fetch(token_id: str, limit: int = 100, verbose: bool = False):
     """Test fetching historical trades with authentication."""
     print("\n" + "="*70)
     print("STEP 2: Fetching Historical Trades")
@@ -85,46 +102,45 @@ def test_trade_fetch(token_id: str, limit: int = 100):
         print(f"✅ Success! Fetched {len(trades)} trades")
 
         # Display sample trades
-        print("\n" + "-"*70)
+        print("\n" + _RULE)
         print("SAMPLE TRADES (first 10)")
-        print("-"*70)
-        print(f"{'Timestamp':<25} {'Price':<12} {'Size':<15} {'Side':<8}")
-        print("-"*70)
+        print(_RULE)
+        rows = [_SAMPLE_HEADER, _RULE]
 
-        for trade in trades[:10]:
-            timestamp = trade.get('timestamp', 'N/A')
-            if isinstance(timestamp, (int, float)):
-                # Convert unix timestamp to datetime
-                dt = datetime.fromtimestamp(timestamp / 1000 if timestamp > 1e12 else timestamp)
-                timestamp = dt.strftime('%Y-%m-%d %H:%M:%S')
+        fromtimestamp = datetime.fromtimestamp
+        for timestamp, price, size, side in map(_SAMPLE_FIELDS, trades[:10]):
+            if timestamp.__class__ is int or timestamp.__class__ is float:
+                # Convert unix timestamp to datetime ('YYYY-MM-DD HH:MM:SS')
+                dt = fromtimestamp(timestamp / 1000 if timestamp > 1e12 else timestamp)
+                timestamp = dt.isoformat(sep=' ', timespec='seconds')
 
-            price = trade.get('price', 0)
-            size = trade.get('size', 0)
-            side = trade.get('side', 'N/A')
-
-            print(f"{timestamp:<25} {price:<12} {size:<15.2f} {side:<8}")
+            rows.append(_format_sample_row(timestamp, price, float(size), side))
 
         if len(trades) > 10:
-            print(f"... and {len(trades) - 10} more trades")
+            rows.append(f"... and {len(trades) - 10} more trades")
+
+        # One write for the whole table instead of a print per row
+        sys.stdout.write("\n".join(rows) + "\n")
 
         # Show time range
-        print("\n" + "-"*70)
+        print("\n" + _RULE)
         print("DATA SUMMARY")
-        print("-"*70)
+        print(_RULE)
 
         timestamps = [t.get('timestamp') for t in trades if 'timestamp' in t]
         if timestamps:
             try:
-                # Handle both unix timestamps and ISO strings
-                def parse_ts(ts):
-                    if isinstance(ts, (int, float)):
-                        return datetime.fromtimestamp(ts / 1000 if ts > 1e12 else ts)
-                    else:
-                        return datetime.fromisoformat(ts.replace('Z', '+00:00'))
-
-                dts = [parse_ts(ts) for ts in timestamps]
-                oldest = min(dts)
-                newest = max(dts)
+                if all(ts.__class__ is int or ts.__class__ is float for ts in timestamps):
+                    # Unix timestamps: reduce in numpy, parse only the extremes
+                    secs = np.asarray(timestamps, dtype=np.float64)
+                    secs = np.where(secs > 1e12, secs / 1000, secs)
+                    oldest = parse_trade_ts(timestamps[int(secs.argmin())])
+                    newest = parse_trade_ts(timestamps[int(secs.argmax())])
+                else:
+                    # ISO strings (or a mix): parse each
+                    dts = [parse_trade_ts(ts) for ts in timestamps]
+                    oldest = min(dts)
+                    newest = max(dts)
 
                 print(f"Oldest trade: {oldest.isoformat()}")
                 print(f"Newest trade: {newest.isoformat()}")
@@ -135,22 +151,24 @@ def test_trade_fetch(token_id: str, limit: int = 100):
                 print(f"Could not parse timestamps: {e}")
 
         # Show price range
-        prices = [float(t.get('price', 0)) for t in trades if 'price' in t]
-        if prices:
-            print(f"\nPrice range: {min(prices):.4f} - {max(prices):.4f}")
+        prices = np.fromiter((float(t['price']) for t in trades if 'price' in t), dtype=np.float64)
+        if prices.size:
+            print(f"\nPrice range: {prices.min():.4f} - {prices.max():.4f}")
 
         # Show volume
-        volumes = [float(t.get('size', 0)) for t in trades if 'size' in t]
-        if volumes:
-            print(f"Total volume: {sum(volumes):.2f}")
+        volumes = np.fromiter((float(t['size']) for t in trades if 'size' in t), dtype=np.float64)
+        if volumes.size:
+            print(f"Total volume: {volumes.sum():.2f}")
 
         print("="*70)
         return True
 
     except Exception as e:
         print(f"❌ Error fetching trades: {e}")
-        import traceback
-        traceback.print_exc()
+        if verbose:
+            traceback.print_exc()
+        else:
+            print("   (run with --verbose for the full traceback)")
         return False
 
 
@@ -162,6 +180,8 @@ def main():
                        help='Token ID to test (default: Bitcoin Up token)')
     parser.add_argument('--limit', type=int, default=100,
                        help='Number of trades to fetch (default: 100)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                       help='Print full tracebacks on errors')
 
     args = parser.parse_args()
 
@@ -178,7 +198,7 @@ def main():
         return
 
     # Test trade fetch
-    fetch_ok = test_trade_fetch(args.token_id, args.limit)
+    fetch_ok = test_trade_fetch(args.token_id, args.limit, args.verbose)
 
     # Final summary
     print("\n" + "="*70)
@@ -9,7 +9,7 @@ from datetime import datetime
 
 # Import the explorer components
 from market_chart_explorer import MarketExplorer
-from price_history import fetch_price_history, get_market_tokens
+from price_history import fetch_price_histories, get_market_tokens
 
 def demo_chart():
     """Demonstrate charting functionality."""
@@ -31,11 +31,7 @@ def demo_chart():
 
     # Find the test market (1013904)
     print("\n2. Searching for market ID 1013904...")
-    test_market = None
-    for market in explorer.markets:
-        if market.get('id') == '1013904':
-            test_market = market
-            break
+    test_market = explorer.markets_by_id.get('1013904')
 
     if not test_market:
         print("   ❌ Market 1013904 not found in cache")
@@ -63,39 +59,43 @@ def demo_chart():
         print("   ❌ Could not fetch token information")
         return
 
-    print(f"   ✓ Token 1 ({tokens['outcome_up']}): {tokens['token_up'][:30]}...")
-    print(f"   ✓ Token 2 ({tokens['outcome_down']}): {tokens['token_down'][:30]}...")
+    up_name, down_name = tokens['outcome_up'], tokens['outcome_down']
+    up_token, down_token = tokens['token_up'], tokens['token_down']
+
+    print(f"   ✓ Token 1 ({up_name}): {up_token:.30}...")
+    print(f"   ✓ Token 2 ({down_name}): {down_token:.30}...")
 
     # Fetch price history with different intervals
     print("\n5. Fetching price history (last 1 day, fidelity=60min)...")
 
-    history1 = fetch_price_history(tokens['token_up'], interval='1d', fidelity=60)
-    history2 = fetch_price_history(tokens['token_down'], interval='1d', fidelity=60)
+    # Both outcomes are independent requests; fetch them in parallel
+    histories = fetch_price_histories([up_token, down_token], interval='1d', fidelity=60)
+    history1, history2 = histories[up_token], histories[down_token]
 
     if history1:
-        print(f"   ✓ {tokens['outcome_up']}: {len(history1)} data points")
+        print(f"   ✓ {up_name}: {len(history1)} data points")
         if history1:
             prices = [p['p'] for p in history1]
             print(f"     Range: ${min(prices):.4f} - ${max(prices):.4f}")
             print(f"     Latest: ${prices[-1]:.4f} at {datetime.fromtimestamp(history1[-1]['t']).isoformat()}")
     else:
-        print(f"   ⚠️  {tokens['outcome_up']}: No data")
+        print(f"   ⚠️  {up_name}: No data")
 
     if history2:
-        print(f"   ✓ {tokens['outcome_down']}: {len(history2)} data points")
+        print(f"   ✓ {down_name}: {len(history2)} data points")
         if history2:
             prices = [p['p'] for p in history2]
             print(f"     Range: ${min(prices):.4f} - ${max(prices):.4f}")
             print(f"     Latest: ${prices[-1]:.4f} at {datetime.fromtimestamp(history2[-1]['t']).isoformat()}")
     else:
-        print(f"   ⚠️  {tokens['outcome_down']}: No data")
+        print(f"   ⚠️  {down_name}: No data")
 
     # Render chart if we have data
     if history1 or history2:
         print("\n6. Rendering price chart...")
         explorer.render_chart(
             history1, history2,
-            tokens['outcome_up'], tokens['outcome_down'],
+            up_name, down_name,
             test_market.get('question', 'Market'),
             '1d'
         )
@@ -11,12 +11,62 @@ Run this BEFORE implementing tick_fetcher.py to understand API limitations.
 """
 
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from api_client import PolymarketAPIClient
-import time
+from json_utils import json_loads
+from time_utils import parse_trade_ts
+from config import CLOB_API_BASE, HTTP_POOL_MAXSIZE
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _build_session() -> requests.Session:
+    """Create one keep-alive session shared by every request in this script."""
+    session = requests.Session()
+    session.headers.update({"User-Agent": "polymarket-crypto-tools/test_trades_api"})
+    # No urllib3 retries: PolymarketAPIClient already retries its own requests
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    return session
+
+
+# All tests (client calls and raw requests) reuse this connection pool
+SESSION = _build_session()
+
+
+# Responses are reused between tests for this long (seconds)
+TRADES_CACHE_TTL = 60
+
+# (token_id, limit) -> (fetched_at, trades)
+TradesCache = Dict[Tuple[str, int], Tuple[float, List[Dict]]]
+
+
+def _get_trades(client: PolymarketAPIClient, token_id: str, limit: int,
+                trades_cache: Optional[TradesCache] = None) -> List[Dict]:
+    """
+    Fetch trades, reusing a fresh cached response for the same or a larger limit.
+
+    The endpoint returns the most recent trades first, so a smaller limit is
+    a prefix of any larger response for the same token.
+    """
+    if trades_cache is not None:
+        now = time.time()
+        for (cached_token, cached_limit), (fetched_at, trades) in trades_cache.items():
+            if cached_token == token_id and cached_limit >= limit and now - fetched_at < TRADES_CACHE_TTL:
+                return trades[:limit]
+
+    trades = client.get_trades(token_id, limit=limit)
+    if trades_cache is not None and isinstance(trades, list):
+        trades_cache[(token_id, limit)] = (time.time(), trades)
+    return trades
 
 
-def test_limit_parameter(client: PolymarketAPIClient, token_id: str):
+def test_limit_parameter(client: PolymarketAPIClient, token_id: str,
+                         trades_cache: Optional[TradesCache] = None):
     """Test different limit values to find maximum."""
     print("\n" + "="*70)
     print("TEST 1: Maximum Limit Parameter")
@@ -26,10 +76,37 @@ def test_limit_parameter(client: PolymarketAPIClient, token_id: str):
 
     results = []
 
+    # Only the smallest and largest limits are queried. A smaller limit returns
+    # a prefix of the largest response, so the middle limits are derived from it
+    largest_limit = test_limits[-1]
+    sentinels = [test_limits[0], largest_limit]
+
+    print(f"\nRequesting limits {sentinels} concurrently...")
+    with ThreadPoolExecutor(max_workers=len(test_limits)) as executor:
+        futures = {limit: executor.submit(client.get_trades, token_id, limit=limit) for limit in sentinels}
+        try:
+            probe = futures[largest_limit].result()
+        except Exception:
+            probe = None
+
+        if not probe or not isinstance(probe, list):
+            # Nothing to derive from (get_trades returns [] on errors too),
+            # so query the remaining limits directly
+            print("Largest limit returned no trades, requesting the remaining limits...")
+            for limit in test_limits:
+                if limit not in futures:
+                    futures[limit] = executor.submit(client.get_trades, token_id, limit=limit)
+
     for limit in test_limits:
-        print(f"\nRequesting limit={limit}...")
+        print(f"\nlimit={limit}:")
+        derived = limit not in futures
         try:
-            trades = client.get_trades(token_id, limit=limit)
+            if derived:
+                trades = probe[:limit]
+            else:
+                trades = futures[limit].result()
+                if trades_cache is not None and isinstance(trades, list):
+                    trades_cache[(token_id, limit)] = (time.time(), trades)
 
             if trades is None:
                 print(f"  ❌ Failed: API returned None")
@@ -37,23 +114,33 @@ def test_limit_parameter(client: PolymarketAPIClient, token_id: str):
                 continue
 
             count = len(trades) if isinstance(trades, list) else 0
-            print(f"  ✓ Received {count} trades")
+            if derived:
+                print(f"  ✓ {count} trades (prefix of limit={largest_limit} response)")
+            else:
+                print(f"  ✓ Received {count} trades")
 
             if count > 0 and isinstance(trades, list):
-                # Show timestamp range
+                # Show timestamp range (one pass, no intermediate list)
                 try:
-                    timestamps = [t.get('timestamp') for t in trades if 'timestamp' in t]
-                    if timestamps:
-                        oldest = min(timestamps)
-                        newest = max(timestamps)
+                    oldest = newest = None
+                    for trade in trades:
+                        if 'timestamp' not in trade:
+                            continue
+                        ts = trade['timestamp']
+                        if oldest is None:
+                            oldest = newest = ts
+                        elif ts < oldest:
+                            oldest = ts
+                        elif ts > newest:
+                            newest = ts
+                    if oldest is not None:
                         print(f"    Oldest: {oldest}")
                         print(f"    Newest: {newest}")
                 except Exception as e:
                     print(f"    Could not parse timestamps: {e}")
 
-            results.append((limit, count, "Success" if count > 0 else "Empty"))
-
-            time.sleep(0.5)  # Rate limiting
+            status = "Success" if count > 0 else "Empty"
+            results.append((limit, count, f"{status}, derived" if derived else status))
 
         except Exception as e:
             print(f"  ❌ Error: {e}")
@@ -71,7 +158,8 @@ def test_limit_parameter(client: PolymarketAPIClient, token_id: str):
     print(f"\n📊 Maximum trades received: {max_received}")
 
 
-def test_pagination(client: PolymarketAPIClient, token_id: str):
+def test_pagination(client: PolymarketAPIClient, token_id: str,
+                    trades_cache: Optional[TradesCache] = None):
     """Test if offset parameter is supported for pagination."""
     print("\n" + "="*70)
     print("TEST 2: Pagination Support (offset parameter)")
@@ -79,7 +167,7 @@ def test_pagination(client: PolymarketAPIClient, token_id: str):
 
     try:
         print("\nFetching batch 1 (offset=0, limit=100)...")
-        batch1 = client.get_trades(token_id, limit=100)
+        batch1 = _get_trades(client, token_id, 100, trades_cache)
 
         if not batch1 or not isinstance(batch1, list):
             print("❌ Failed to fetch first batch")
@@ -92,16 +180,13 @@ def test_pagination(client: PolymarketAPIClient, token_id: str):
         print("\nTrying offset=100...")
 
         # Direct API test (bypassing current client)
-        import requests
-        from config import CLOB_API_BASE
-
         url = f"{CLOB_API_BASE}/trades"
         params = {"token_id": token_id, "limit": 100, "offset": 100}
 
-        response = requests.get(url, params=params, timeout=30)
+        response = SESSION.get(url, params=params, timeout=30)
 
         if response.status_code == 200:
-            batch2 = response.json()
+            batch2 = json_loads(response.content)
             if isinstance(batch2, list):
                 print(f"✓ Batch 2: {len(batch2)} trades")
 
@@ -133,7 +218,8 @@ def test_pagination(client: PolymarketAPIClient, token_id: str):
         print("⚠️  Pagination likely not supported")
 
 
-def test_historical_depth(client: PolymarketAPIClient, token_id: str):
+def test_historical_depth(client: PolymarketAPIClient, token_id: str,
+                          trades_cache: Optional[TradesCache] = None):
     """Determine how far back trade history goes."""
     print("\n" + "="*70)
     print("TEST 3: Historical Depth")
@@ -141,7 +227,7 @@ def test_historical_depth(client: PolymarketAPIClient, token_id: str):
 
     try:
         print("\nFetching maximum available trades...")
-        trades = client.get_trades(token_id, limit=1000)
+        trades = _get_trades(client, token_id, 1000, trades_cache)
 
         if not trades or not isinstance(trades, list):
             print("❌ Failed to fetch trades")
@@ -154,29 +240,18 @@ def test_historical_depth(client: PolymarketAPIClient, token_id: str):
             return
 
         # Parse timestamps
+        raw = [t['timestamp'] for t in trades if t.get('timestamp')]
         timestamps = []
-        for trade in trades:
-            ts = trade.get('timestamp')
-            if ts:
+        if raw and all(ts.__class__ is int or ts.__class__ is float for ts in raw):
+            # Unix timestamps: reduce in numpy, parse only the extremes
+            secs = np.asarray(raw, dtype=np.float64)
+            secs = np.where(secs > 1e12, secs / 1000, secs)
+            timestamps = [parse_trade_ts(raw[int(secs.argmin())]), parse_trade_ts(raw[int(secs.argmax())])]
+        else:
+            for ts in raw:
                 try:
-                    # Handle different timestamp formats
-                    if isinstance(ts, (int, float)):
-                        # Unix timestamp (ms or seconds)
-                        if ts > 1e12:  # milliseconds
-                            dt = datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
-                        else:  # seconds
-                            dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-                    elif isinstance(ts, str):
-                        # ISO 8601 string
-                        if 'Z' in ts or '+' in ts:
-                            dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                        else:
-                            dt = datetime.fromisoformat(ts)
-                    else:
-                        continue
-
-                    timestamps.append(dt)
-                except Exception as e:
+                    timestamps.append(parse_trade_ts(ts))
+                except (TypeError, ValueError) as e:
                     print(f"  Warning: Could not parse timestamp {ts}: {e}")
 
         if not timestamps:
@@ -209,14 +284,15 @@ def test_historical_depth(client: PolymarketAPIClient, token_id: str):
         print(f"❌ Error: {e}")
 
 
-def test_data_format(client: PolymarketAPIClient, token_id: str):
+def test_data_format(client: PolymarketAPIClient, token_id: str,
+                     trades_cache: Optional[TradesCache] = None):
     """Examine the structure of trade data returned."""
     print("\n" + "="*70)
     print("TEST 4: Data Format & Fields")
     print("="*70)
 
     try:
-        trades = client.get_trades(token_id, limit=5)
+        trades = _get_trades(client, token_id, 5, trades_cache)
 
         if not trades or not isinstance(trades, list):
             print("❌ Failed to fetch trades")
@@ -264,13 +340,15 @@ def main():
     print(f"Market: Bitcoin Up or Down")
     print(f"Market ID: {market_id}")
 
-    client = PolymarketAPIClient()
+    client = PolymarketAPIClient(session=SESSION)
 
     # Run tests
-    test_data_format(client, token_id)
-    test_limit_parameter(client, token_id)
-    test_pagination(client, token_id)
-    test_historical_depth(client, token_id)
+    # The limit sweep runs first so later tests can reuse its responses
+    trades_cache: TradesCache = {}
+    test_limit_parameter(client, token_id, trades_cache)
+    test_data_format(client, token_id, trades_cache)
+    test_pagination(client, token_id, trades_cache)
+    test_historical_depth(client, token_id, trades_cache)
 
     # Final summary
     print("\n" + "="*70)
@@ -282,6 +360,8 @@ def main():
     print("3. Document findings in CLAUDE.md")
     print("="*70)
 
+    SESSION.close()
+
 
 if __name__ == "__main__":
     main()
@@ -8,36 +8,321 @@ This module provides persistent storage for:
 Database Schema:
 - trades: Individual trade records with deduplication
 - markets: Market metadata cache
+- markets_map, assets, sides, sources: Integer keys stored in trades
+- trades_v: trades joined back to text IDs (used by all queries)
 """
 
 import sqlite3
 import csv
-from datetime import datetime, timezone
-from typing import List, Dict, Optional, Tuple
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
-import hashlib
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: Parquet export
+    pa = pq = None
+
+from time_utils import to_epoch_ns, epoch_ns_to_iso
+
+from config import (
+    TICK_DB_PATH, TICK_DB_JOURNAL_MODE, TICK_DB_SYNCHRONOUS,
+    TICK_DB_CACHE_SIZE_KB, TICK_DB_MMAP_SIZE, TICK_DB_CACHED_STATEMENTS
+)
+
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+NS_PER_DAY = 86_400 * 1_000_000_000
+
+# Market and token IDs are long strings, so trades store small integer keys
+# into these lookup tables instead; side and source are fixed enums
+_LOOKUP_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS markets_map (
+        market_pk INTEGER PRIMARY KEY,
+        market_id TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS assets (
+        asset_pk INTEGER PRIMARY KEY,
+        asset_id TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS sides (
+        side INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    CREATE TABLE IF NOT EXISTS sources (
+        source INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    );
+    INSERT OR IGNORE INTO sides VALUES (1, 'BUY'), (2, 'SELL');
+    INSERT OR IGNORE INTO sources VALUES (1, 'websocket'), (2, 'rest_api');
+"""
+
+# Enum codes stored in trades.side / trades.source (mirrors sides / sources)
+SIDE_CODES = {'BUY': 1, 'SELL': 2}
+SOURCE_CODES = {'websocket': 1, 'rest_api': 2}
+
+# Trades are deduplicated on their natural key (asset_pk, timestamp, price, size).
+# timestamp and recorded_at are integer nanoseconds since the Unix epoch;
+# timestamp_iso is a virtual ISO 8601 view of timestamp for display/export,
+# trade_day buckets trades by UTC day for day-range pruning and archival.
+_TRADES_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {{table}} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        market_pk INTEGER NOT NULL REFERENCES markets_map(market_pk),
+        asset_pk INTEGER NOT NULL REFERENCES assets(asset_pk),
+        side INTEGER NOT NULL CHECK (side IN (1, 2)),
+        outcome TEXT,
+        price REAL NOT NULL,
+        size REAL NOT NULL,
+        fee_rate_bps INTEGER,
+        timestamp INTEGER NOT NULL,
+        source INTEGER NOT NULL CHECK (source IN (1, 2)),
+        recorded_at INTEGER NOT NULL,
+        timestamp_iso TEXT GENERATED ALWAYS AS (
+            strftime('%Y-%m-%dT%H:%M:%fZ', timestamp / 1e9, 'unixepoch')
+        ) VIRTUAL,
+        trade_day INTEGER GENERATED ALWAYS AS (timestamp / {NS_PER_DAY}) VIRTUAL,
+        UNIQUE (asset_pk, timestamp, price, size)
+    )
+"""
+
+_TRADE_COLUMNS = (
+    "market_pk, asset_pk, side, outcome, price, size, "
+    "fee_rate_bps, timestamp, source, recorded_at"
+)
+
+# trades with the integer keys joined back to their text values; every query
+# and export reads from here, so callers still see market_id, 'BUY', etc.
+_TRADES_VIEW_SQL = """
+    CREATE VIEW IF NOT EXISTS trades_v AS
+    SELECT t.id, m.market_id, a.asset_id, sd.name AS side, t.outcome,
+           t.price, t.size, t.fee_rate_bps, t.timestamp, src.name AS source,
+           t.recorded_at, t.timestamp_iso, t.trade_day
+    FROM trades t
+    JOIN markets_map m ON m.market_pk = t.market_pk
+    JOIN assets a ON a.asset_pk = t.asset_pk
+    JOIN sides sd ON sd.side = t.side
+    JOIN sources src ON src.source = t.source
+"""
+
+# Per-market one-minute rollups, kept current by an AFTER INSERT trigger so
+# summaries and minute bars never scan raw trades. open/close follow trade
+# time (first_ts/last_ts), not arrival order.
+_ROLLUP_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS trades_1m (
+        market_pk INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        trades INTEGER NOT NULL,
+        websocket_trades INTEGER NOT NULL,
+        volume REAL NOT NULL,
+        open REAL NOT NULL,
+        high REAL NOT NULL,
+        low REAL NOT NULL,
+        close REAL NOT NULL,
+        first_ts INTEGER NOT NULL,
+        last_ts INTEGER NOT NULL,
+        PRIMARY KEY (market_pk, bucket)
+    ) WITHOUT ROWID
+"""
+
+_ROLLUP_TRIGGER_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS trades_1m_rollup AFTER INSERT ON trades
+    BEGIN
+        INSERT INTO trades_1m (
+            market_pk, bucket, trades, websocket_trades, volume,
+            open, high, low, close, first_ts, last_ts
+        ) VALUES (
+            NEW.market_pk, NEW.timestamp / {NS_PER_MINUTE}, 1,
+            NEW.source = {SOURCE_CODES['websocket']}, NEW.size,
+            NEW.price, NEW.price, NEW.price, NEW.price, NEW.timestamp, NEW.timestamp
+        )
+        ON CONFLICT (market_pk, bucket) DO UPDATE SET
+            trades = trades + 1,
+            websocket_trades = websocket_trades + excluded.websocket_trades,
+            volume = volume + excluded.volume,
+            open = CASE WHEN excluded.first_ts < first_ts THEN excluded.open ELSE open END,
+            high = max(high, excluded.high),
+            low = min(low, excluded.low),
+            close = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close ELSE close END,
+            first_ts = min(first_ts, excluded.first_ts),
+            last_ts = max(last_ts, excluded.last_ts);
+    END
+"""
+
+# Resolves a market ID to its key inside a query
+_MARKET_PK_SQL = "(SELECT market_pk FROM markets_map WHERE market_id = ?)"
+
+# Insert statements are module constants so every call passes sqlite3 the
+# same SQL text and reuses its prepared statement from the connection cache
+_INSERT_TRADE_SQL = f"""
+    INSERT OR IGNORE INTO trades ({_TRADE_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_MARKET_SQL = """
+    INSERT OR REPLACE INTO markets (
+        market_id, question, outcome_up, outcome_down,
+        token_up, token_down, created_at, closed, closed_time,
+        first_seen, last_updated
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
+        COALESCE((SELECT first_seen FROM markets WHERE market_id = ?), ?),
+        ?)
+"""
+
+# Required trade fields, fetched in one C-level call per row
+_REQUIRED_TRADE_FIELDS = itemgetter('market_id', 'asset_id', 'side', 'price', 'size', 'timestamp', 'source')
+
+def _build_trade_queries() -> Dict[Tuple[str, int], str]:
+    """
+    Pre-build every trade query variant, keyed by (key column, filter mask).
+
+    Mask bits: 1 start_time, 2 end_time, 4 outcome, 8 keyset cursor, 16 limit.
+    A fixed SQL text per combination keeps each variant in the statement cache.
+    """
+    # trade_day bounds let the planner prune to the covered days
+    filters = (
+        " AND timestamp >= ? AND trade_day >= ?",
+        " AND timestamp < ? AND trade_day <= ?",
+        " AND outcome = ?",
+        " AND (timestamp, id) > (?, ?)",
+    )
+    queries = {}
+    for key_column in ('market_id', 'asset_id'):
+        for mask in range(32):
+            query = f"SELECT * FROM trades_v WHERE {key_column} = ?"
+            query += "".join(f for bit, f in enumerate(filters) if mask & (1 << bit))
+            # id breaks timestamp ties so pages never skip or repeat rows
+            query += " ORDER BY timestamp ASC, id ASC"
+            if mask & 16:
+                query += " LIMIT ?"
+            queries[(key_column, mask)] = query
+    return queries
+
+
+_TRADE_QUERIES = _build_trade_queries()
+
+# Default page size for keyset-paginated trade queries
+TRADES_PAGE_SIZE = 10_000
+
+# Rows fetched per round trip when streaming exports
+_EXPORT_FETCH_SIZE = 10_000
+_PARQUET_BATCH_SIZE = 50_000  # Also the Parquet row group size
 
 
 class TickDatabase:
     """Manages SQLite database for tick data storage and retrieval."""
 
-    def __init__(self, db_path: str = "data/ticks.db"):
+    def __init__(self, db_path: str = TICK_DB_PATH,
+                 journal_mode: str = TICK_DB_JOURNAL_MODE,
+                 synchronous: str = TICK_DB_SYNCHRONOUS):
         """
         Initialize database connection and create schema if needed.
 
         Args:
             db_path: Path to SQLite database file
+            journal_mode: SQLite journal mode ("WAL", or "DELETE" for the default rollback journal)
+            synchronous: SQLite synchronous level ("NORMAL", "FULL", ...)
         """
         self.db_path = db_path
 
         # Ensure data directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # A larger statement cache (sqlite3 default: 128) keeps the insert
+        # statements prepared alongside the per-filter query variants.
+        # isolation_level=None: statements autocommit and writes that need a
+        # transaction open one explicitly with _write_txn()
+        self.conn = sqlite3.connect(
+            db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=TICK_DB_CACHED_STATEMENTS
+        )
         self.conn.row_factory = sqlite3.Row  # Enable dict-like access
 
+        # Queries run on per-thread read-only connections so they never
+        # queue behind (or block) batch commits on the write connection
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        # In-memory and URI databases can't be reopened read-only by path,
+        # so their queries share the write connection
+        self._shared_reads = db_path in (":memory:", "") or str(db_path).startswith("file:")
+
+        # ID -> integer key caches for markets_map / assets (see market_pk())
+        self._market_pks: Dict[str, int] = {}
+        self._asset_pks: Dict[str, int] = {}
+
+        self._configure_pragmas(journal_mode, synchronous)
         self._create_schema()
 
+    def _reader(self) -> sqlite3.Connection:
+        """Return this thread's read-only connection, opening it on first use."""
+        if self._shared_reads:
+            return self.conn
+
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            reader = sqlite3.connect(
+                uri,
+                uri=True,
+                isolation_level=None,
+                check_same_thread=False,  # Only this thread queries it; close() may run elsewhere
+                cached_statements=TICK_DB_CACHED_STATEMENTS
+            )
+            reader.row_factory = sqlite3.Row
+            reader.execute("PRAGMA query_only=1")
+            reader.execute("PRAGMA temp_store=MEMORY")  # Export sorts stay off disk
+            reader.execute(f"PRAGMA cache_size={-TICK_DB_CACHE_SIZE_KB}")
+            reader.execute(f"PRAGMA mmap_size={TICK_DB_MMAP_SIZE}")
+
+            self._local.reader = reader
+            with self._readers_lock:
+                self._readers.append(reader)
+        return reader
+
+    def _configure_pragmas(self, journal_mode: str, synchronous: str):
+        """
+        Tune the connection for a write-heavy tick stream.
+
+        journal_mode is persistent (a WAL database stays in WAL on reopen);
+        the remaining settings apply to this connection only.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute(f"PRAGMA cache_size={-TICK_DB_CACHE_SIZE_KB}")  # Negative = KiB
+        cursor.execute(f"PRAGMA mmap_size={TICK_DB_MMAP_SIZE}")
+        cursor.execute("PRAGMA wal_autocheckpoint=1000")
+
+    @contextmanager
+    def _write_txn(self):
+        """
+        Run a block inside a BEGIN IMMEDIATE ... COMMIT transaction.
+
+        Taking the write lock up front avoids upgrading a deferred read
+        transaction mid-batch; WAL readers are not blocked.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def checkpoint(self):
+        """Checkpoint the WAL into the main database and truncate it."""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def _create_schema(self):
         """Create database tables and indices if they don't exist."""
         cursor = self.conn.cursor()
@@ -59,44 +344,88 @@ class TickDatabase:
             )
         """)
 
+        # Key lookup tables for trades
+        cursor.executescript(_LOOKUP_TABLES_SQL)
+
         # Trades table: Individual tick data
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS trades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                trade_id TEXT UNIQUE NOT NULL,
-                market_id TEXT NOT NULL,
-                asset_id TEXT NOT NULL,
-                side TEXT NOT NULL CHECK (side IN ('BUY', 'SELL')),
-                outcome TEXT,
-                price REAL NOT NULL,
-                size REAL NOT NULL,
-                fee_rate_bps INTEGER,
-                timestamp TEXT NOT NULL,
-                source TEXT NOT NULL CHECK (source IN ('websocket', 'rest_api')),
-                recorded_at TEXT NOT NULL,
-                FOREIGN KEY (market_id) REFERENCES markets(market_id)
-            )
-        """)
+        cursor.execute(_TRADES_TABLE_SQL.format(table="trades"))
+
+        # Older databases have an MD5 trade_id column, TEXT timestamps and/or
+        # TEXT market/asset IDs in every row
+        columns = {row['name']: row['type'] for row in cursor.execute("PRAGMA table_info(trades)")}
+        if 'market_pk' not in columns:
+            self.migrate_trades()
+
+        cursor.execute(_TRADES_VIEW_SQL)
+
+        self._create_indices()
+        self._create_rollups()
+
+    def _create_rollups(self):
+        """Create the trades_1m rollup table and trigger, backfilling a new table."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trades_1m'"
+        ).fetchone()
+
+        self.conn.execute(_ROLLUP_TABLE_SQL)
+        self.conn.execute(_ROLLUP_TRIGGER_SQL)
+
+        if not exists:
+            self.rebuild_rollups()
+
+    def rebuild_rollups(self):
+        """Recompute trades_1m from the raw trades table."""
+        with self._write_txn():
+            self.conn.execute("DELETE FROM trades_1m")
+            self.conn.execute(f"""
+                INSERT INTO trades_1m (
+                    market_pk, bucket, trades, websocket_trades, volume,
+                    open, high, low, close, first_ts, last_ts
+                )
+                SELECT market_pk, bucket, COUNT(*), SUM(source = {SOURCE_CODES['websocket']}), SUM(size),
+                       MIN(open), MAX(price), MIN(price), MIN(close), MIN(timestamp), MAX(timestamp)
+                FROM (
+                    SELECT market_pk, source, size, price, timestamp,
+                           timestamp / {NS_PER_MINUTE} AS bucket,
+                           FIRST_VALUE(price) OVER w AS open,
+                           LAST_VALUE(price) OVER w AS close
+                    FROM trades
+                    WINDOW w AS (
+                        PARTITION BY market_pk, timestamp / {NS_PER_MINUTE}
+                        ORDER BY timestamp, id
+                        ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                    )
+                )
+                GROUP BY market_pk, bucket
+            """)
+
+    def _create_indices(self):
+        """Create indices for fast querying."""
+        cursor = self.conn.cursor()
 
-        # Create indices for fast querying
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_trades_market_id
-            ON trades(market_id)
-        """)
+        # The UNIQUE (asset_pk, ...) index already serves token lookups
+        cursor.execute("DROP INDEX IF EXISTS idx_trades_asset_id")
 
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_trades_asset_id
-            ON trades(asset_id)
+            CREATE INDEX IF NOT EXISTS idx_trades_timestamp
+            ON trades(timestamp)
         """)
 
+        # Covering index: market range scans are answered from the index
+        # without touching the table. It costs one wider index write per
+        # trade, so it replaces the (market_id) and (market_id, timestamp)
+        # indices it makes redundant.
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_trades_timestamp
-            ON trades(timestamp)
+            CREATE INDEX IF NOT EXISTS idx_trades_mkt_ts_cov
+            ON trades(market_pk, timestamp, price, size, side, outcome, source)
         """)
+        cursor.execute("DROP INDEX IF EXISTS idx_trades_market_id")
+        cursor.execute("DROP INDEX IF EXISTS idx_trades_market_timestamp")
 
+        # Day buckets: short cross-market windows and per-day archival
         cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_trades_market_timestamp
-            ON trades(market_id, timestamp)
+            CREATE INDEX IF NOT EXISTS idx_trades_day_mkt
+            ON trades(trade_day, market_pk, timestamp)
         """)
 
         cursor.execute("""
@@ -104,29 +433,47 @@ class TickDatabase:
             ON markets(closed)
         """)
 
-        self.conn.commit()
-
-    def _generate_trade_id(self, asset_id: str, timestamp: str, price: float, size: float) -> str:
+    def migrate_trades(self):
         """
-        Generate unique trade ID from trade data.
-
-        Uses composite key to prevent duplicates when WebSocket and REST API
-        return the same trades.
+        Rebuild a legacy trades table in the current schema.
 
-        Args:
-            asset_id: Token ID
-            timestamp: ISO 8601 timestamp
-            price: Trade price
-            size: Trade size
-
-        Returns:
-            Unique trade ID string
+        Drops the MD5 trade_id column, rewrites ISO 8601 TEXT timestamps as
+        epoch nanoseconds and replaces market/asset IDs, side and source with
+        integer keys. Rows are copied in insertion order; the UNIQUE natural
+        key drops any duplicates the old hash did not catch.
         """
-        # Create composite key
-        key = f"{asset_id}_{timestamp}_{price:.6f}_{size:.6f}"
+        print("Migrating trades table to the current schema...")
+
+        self.conn.create_function("to_epoch_ns", 1, to_epoch_ns, deterministic=True)
+
+        self.conn.executescript(f"""
+            BEGIN;
+            DROP VIEW IF EXISTS trades_v;
+            {_TRADES_TABLE_SQL.format(table="trades_v4")};
+            INSERT OR IGNORE INTO markets_map (market_id) SELECT DISTINCT market_id FROM trades;
+            INSERT OR IGNORE INTO assets (asset_id) SELECT DISTINCT asset_id FROM trades;
+            INSERT OR IGNORE INTO trades_v4 (id, {_TRADE_COLUMNS})
+                SELECT t.id, m.market_pk, a.asset_pk, sd.side, t.outcome, t.price, t.size,
+                       t.fee_rate_bps, to_epoch_ns(t.timestamp), src.source,
+                       to_epoch_ns(t.recorded_at)
+                FROM trades t
+                JOIN markets_map m ON m.market_id = t.market_id
+                JOIN assets a ON a.asset_id = t.asset_id
+                JOIN sides sd ON sd.name = t.side
+                JOIN sources src ON src.name = t.source
+                ORDER BY t.id;
+            DROP TABLE trades;
+            ALTER TABLE trades_v4 RENAME TO trades;
+            {_TRADES_VIEW_SQL};
+            DROP TABLE IF EXISTS trades_1m;
+            COMMIT;
+        """)
+
+        # Reclaim the space freed by the narrower rows
+        self.conn.execute("VACUUM")
 
-        # Hash for consistent length (optional, can use key directly)
-        return hashlib.md5(key.encode()).hexdigest()
+        self._create_indices()
+        self._create_rollups()
 
     def insert_market(self, market_data: Dict) -> bool:
         """
@@ -148,17 +495,9 @@ class TickDatabase:
             True if successful
         """
         cursor = self.conn.cursor()
-        now = datetime.now(timezone.utc).isoformat()
+        now = epoch_ns_to_iso(time.time_ns())
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO markets (
-                market_id, question, outcome_up, outcome_down,
-                token_up, token_down, created_at, closed, closed_time,
-                first_seen, last_updated
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?,
-                COALESCE((SELECT first_seen FROM markets WHERE market_id = ?), ?),
-                ?)
-        """, (
+        cursor.execute(_INSERT_MARKET_SQL, (
             market_data['market_id'],
             market_data['question'],
             market_data.get('outcome_up'),
@@ -173,15 +512,77 @@ class TickDatabase:
             now   # last_updated
         ))
 
-        self.conn.commit()
         return True
 
+    def _lookup_pk(self, cache: Dict[str, int], table: str, pk_column: str,
+                   id_column: str, key: str) -> int:
+        """Return the integer key for key in a lookup table, adding it if new."""
+        pk = cache.get(key)
+        if pk is None:
+            self.conn.execute(f"INSERT OR IGNORE INTO {table} ({id_column}) VALUES (?)", (key,))
+            pk = self.conn.execute(
+                f"SELECT {pk_column} FROM {table} WHERE {id_column} = ?", (key,)
+            ).fetchone()[0]
+            cache[key] = pk
+        return pk
+
+    def market_pk(self, market_id: str) -> int:
+        """
+        Get the integer key stored in trades for a market ID.
+
+        New IDs are registered on first use, so call this outside an open
+        write transaction (trade_row() and the recorder do).
+        """
+        return self._lookup_pk(self._market_pks, 'markets_map', 'market_pk', 'market_id', market_id)
+
+    def asset_pk(self, asset_id: str) -> int:
+        """Get the integer key stored in trades for a token ID (see market_pk)."""
+        return self._lookup_pk(self._asset_pks, 'assets', 'asset_pk', 'asset_id', asset_id)
+
+    def trade_row(self, trade_data: Dict) -> Tuple:
+        """
+        Build the INSERT parameter tuple for a trade.
+
+        Args:
+            trade_data: Trade dictionary (see insert_trade for keys)
+
+        Returns:
+            Tuple in the column order of _INSERT_TRADE_SQL
+        """
+        market_id, asset_id, side, price, size, timestamp, source = _REQUIRED_TRADE_FIELDS(trade_data)
+        get = trade_data.get
+
+        return (
+            self.market_pk(market_id), self.asset_pk(asset_id), SIDE_CODES[side],
+            get('outcome'), price, size, get('fee_rate_bps'), to_epoch_ns(timestamp),
+            SOURCE_CODES[source],
+            time.time_ns()  # recorded_at
+        )
+
+    def insert_trades_fast(self, rows: Iterable[Tuple]) -> int:
+        """
+        Insert prepared trade rows in a single transaction.
+
+        Duplicates are skipped with INSERT OR IGNORE.
+
+        Args:
+            rows: Tuples built by trade_row() (a list or any iterable)
+
+        Returns:
+            Number of rows inserted (excluding duplicates)
+        """
+        with self._write_txn():  # One BEGIN/COMMIT for the whole batch
+            cursor = self.conn.executemany(_INSERT_TRADE_SQL, rows)
+
+        return cursor.rowcount
+
     def insert_trade(self, trade_data: Dict) -> bool:
         """
-        Insert trade into database.
+        Insert a single trade into database.
 
-        Automatically generates trade_id and handles duplicates with
-        INSERT OR IGNORE.
+        Duplicates (same asset, timestamp, price and size) are ignored.
+        Convenience wrapper around insert_trades_fast(); high-rate callers
+        should buffer rows from trade_row() and insert them in batches.
 
         Args:
             trade_data: Dictionary with keys:
@@ -192,51 +593,13 @@ class TickDatabase:
                 - price: Trade price (required)
                 - size: Trade size (required)
                 - fee_rate_bps: Fee rate in basis points (optional)
-                - timestamp: ISO 8601 timestamp (required)
+                - timestamp: ISO 8601 or Unix timestamp (required)
                 - source: "websocket" or "rest_api" (required)
 
         Returns:
             True if inserted, False if duplicate
         """
-        cursor = self.conn.cursor()
-
-        # Generate unique trade ID
-        trade_id = self._generate_trade_id(
-            trade_data['asset_id'],
-            trade_data['timestamp'],
-            trade_data['price'],
-            trade_data['size']
-        )
-
-        recorded_at = datetime.now(timezone.utc).isoformat()
-
-        try:
-            cursor.execute("""
-                INSERT OR IGNORE INTO trades (
-                    trade_id, market_id, asset_id, side, outcome,
-                    price, size, fee_rate_bps, timestamp, source, recorded_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                trade_id,
-                trade_data['market_id'],
-                trade_data['asset_id'],
-                trade_data['side'],
-                trade_data.get('outcome'),
-                trade_data['price'],
-                trade_data['size'],
-                trade_data.get('fee_rate_bps'),
-                trade_data['timestamp'],
-                trade_data['source'],
-                recorded_at
-            ))
-
-            self.conn.commit()
-
-            # Check if row was inserted (rowcount > 0) or ignored (rowcount == 0)
-            return cursor.rowcount > 0
-
-        except sqlite3.IntegrityError:
-            return False
+        return self.insert_trades_fast([self.trade_row(trade_data)]) > 0
 
     def insert_trades_batch(self, trades: List[Dict]) -> int:
         """
@@ -248,13 +611,9 @@ class TickDatabase:
         Returns:
             Number of trades successfully inserted (excluding duplicates)
         """
-        inserted_count = 0
-
-        for trade in trades:
-            if self.insert_trade(trade):
-                inserted_count += 1
-
-        return inserted_count
+        # Rows are built up front so new market/asset keys are registered
+        # before the write transaction opens
+        return self.insert_trades_fast([self.trade_row(trade) for trade in trades])
 
     def get_market(self, market_id: str) -> Optional[Dict]:
         """
@@ -266,7 +625,7 @@ class TickDatabase:
         Returns:
             Dictionary with market data or None if not found
         """
-        cursor = self.conn.cursor()
+        cursor = self._reader().cursor()
 
         cursor.execute("""
             SELECT * FROM markets WHERE market_id = ?
@@ -278,44 +637,149 @@ class TickDatabase:
             return dict(row)
         return None
 
-    def get_trades_by_market(self, market_id: str,
-                           start_time: Optional[str] = None,
-                           end_time: Optional[str] = None,
-                           outcome: Optional[str] = None) -> List[Dict]:
+    def _trades_cursor(self, key_column: str, key: str,
+                       start_time=None, end_time=None,
+                       outcome: Optional[str] = None,
+                       after: Optional[Tuple[int, int]] = None,
+                       limit: Optional[int] = None) -> sqlite3.Cursor:
         """
-        Query trades for a market with optional filtering.
+        Execute a trade query filtered on key_column (market_id or asset_id).
+
+        after is a (timestamp, id) keyset cursor: only rows strictly after it
+        in (timestamp, id) order are returned.
+        """
+        params = [key]
+        mask = 0
+
+        if start_time:
+            start_ns = to_epoch_ns(start_time)
+            params += [start_ns, start_ns // NS_PER_DAY]
+            mask |= 1
+
+        if end_time:
+            end_ns = to_epoch_ns(end_time)
+            params += [end_ns, end_ns // NS_PER_DAY]
+            mask |= 2
+
+        if outcome:
+            params.append(outcome)
+            mask |= 4
+
+        if after is not None:
+            params += after
+            mask |= 8
+
+        if limit is not None:
+            params.append(limit)
+            mask |= 16
+
+        cursor = self._reader().cursor()
+        cursor.execute(_TRADE_QUERIES[(key_column, mask)], params)
+        return cursor
+
+    def _trades_page(self, cursor: sqlite3.Cursor,
+                     limit: int) -> Tuple[List[Dict], Optional[Tuple[int, int]]]:
+        """Materialise one page and derive the cursor for the next one."""
+        rows = [dict(row) for row in cursor]
+        if len(rows) < limit:
+            return rows, None
+        return rows, (rows[-1]['timestamp'], rows[-1]['id'])
+
+    def get_trades_page_by_market(self, market_id: str,
+                                  after: Optional[Tuple[int, int]] = None,
+                                  limit: int = TRADES_PAGE_SIZE,
+                                  start_time: Optional[str] = None,
+                                  end_time: Optional[str] = None,
+                                  outcome: Optional[str] = None) -> Tuple[List[Dict], Optional[Tuple[int, int]]]:
+        """
+        Query one page of trades for a market (keyset pagination).
 
         Args:
             market_id: Market ID
-            start_time: ISO 8601 timestamp (inclusive)
-            end_time: ISO 8601 timestamp (exclusive)
-            outcome: Filter by outcome ("UP", "DOWN", etc.)
+            after: Cursor returned by the previous page (None for the first page)
+            limit: Maximum trades per page
+            start_time, end_time, outcome: Same filters as get_trades_by_market()
 
         Returns:
-            List of trade dictionaries sorted by timestamp
+            (trades, next_cursor); next_cursor is None on the last page
         """
-        cursor = self.conn.cursor()
+        cursor = self._trades_cursor('market_id', market_id, start_time, end_time, outcome,
+                                     after=after, limit=limit)
+        return self._trades_page(cursor, limit)
+
+    def get_trades_page_by_token(self, asset_id: str,
+                                 after: Optional[Tuple[int, int]] = None,
+                                 limit: int = TRADES_PAGE_SIZE,
+                                 start_time: Optional[str] = None,
+                                 end_time: Optional[str] = None) -> Tuple[List[Dict], Optional[Tuple[int, int]]]:
+        """
+        Query one page of trades for a token (keyset pagination).
 
-        query = "SELECT * FROM trades WHERE market_id = ?"
-        params = [market_id]
+        Args:
+            asset_id: Token ID
+            after: Cursor returned by the previous page (None for the first page)
+            limit: Maximum trades per page
+            start_time, end_time: Same filters as get_trades_by_token()
 
-        if start_time:
-            query += " AND timestamp >= ?"
-            params.append(start_time)
+        Returns:
+            (trades, next_cursor); next_cursor is None on the last page
+        """
+        cursor = self._trades_cursor('asset_id', asset_id, start_time, end_time,
+                                     after=after, limit=limit)
+        return self._trades_page(cursor, limit)
+
+    def iter_trades_by_market(self, market_id: str,
+                              start_time: Optional[str] = None,
+                              end_time: Optional[str] = None,
+                              outcome: Optional[str] = None) -> Iterator[sqlite3.Row]:
+        """
+        Stream trades for a market as sqlite3.Row objects (no dict copies).
 
-        if end_time:
-            query += " AND timestamp < ?"
-            params.append(end_time)
+        Takes the same filters as get_trades_by_market().
+        """
+        yield from self._trades_cursor('market_id', market_id, start_time, end_time, outcome)
 
-        if outcome:
-            query += " AND outcome = ?"
-            params.append(outcome)
+    def iter_trades_by_token(self, asset_id: str,
+                             start_time: Optional[str] = None,
+                             end_time: Optional[str] = None) -> Iterator[sqlite3.Row]:
+        """
+        Stream trades for a token as sqlite3.Row objects (no dict copies).
 
-        query += " ORDER BY timestamp ASC"
+        Takes the same filters as get_trades_by_token().
+        """
+        yield from self._trades_cursor('asset_id', asset_id, start_time, end_time)
 
-        cursor.execute(query, params)
+    def get_trades_frame(self, market_id: str,
+                         start_time: Optional[str] = None,
+                         end_time: Optional[str] = None,
+                         outcome: Optional[str] = None) -> pd.DataFrame:
+        """
+        Load trades for a market straight into a DataFrame.
 
-        return [dict(row) for row in cursor.fetchall()]
+        Takes the same filters as get_trades_by_market().
+        """
+        cursor = self._trades_cursor('market_id', market_id, start_time, end_time, outcome)
+        columns = [d[0] for d in cursor.description]
+        cursor.row_factory = None  # Plain tuples for the DataFrame constructor
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def get_trades_by_market(self, market_id: str,
+                           start_time: Optional[str] = None,
+                           end_time: Optional[str] = None,
+                           outcome: Optional[str] = None) -> List[Dict]:
+        """
+        Query trades for a market with optional filtering.
+
+        Args:
+            market_id: Market ID
+            start_time: ISO 8601 timestamp or epoch nanoseconds (inclusive)
+            end_time: ISO 8601 timestamp or epoch nanoseconds (exclusive)
+            outcome: Filter by outcome ("UP", "DOWN", etc.)
+
+        Returns:
+            List of trade dictionaries sorted by timestamp
+        """
+        return [dict(row) for row in self.iter_trades_by_market(market_id, start_time, end_time, outcome)]
 
     def get_trades_by_token(self, asset_id: str,
                            start_time: Optional[str] = None,
@@ -325,30 +789,13 @@ class TickDatabase:
 
         Args:
             asset_id: Token ID
-            start_time: ISO 8601 timestamp (inclusive)
-            end_time: ISO 8601 timestamp (exclusive)
+            start_time: ISO 8601 timestamp or epoch nanoseconds (inclusive)
+            end_time: ISO 8601 timestamp or epoch nanoseconds (exclusive)
 
         Returns:
             List of trade dictionaries sorted by timestamp
         """
-        cursor = self.conn.cursor()
-
-        query = "SELECT * FROM trades WHERE asset_id = ?"
-        params = [asset_id]
-
-        if start_time:
-            query += " AND timestamp >= ?"
-            params.append(start_time)
-
-        if end_time:
-            query += " AND timestamp < ?"
-            params.append(end_time)
-
-        query += " ORDER BY timestamp ASC"
-
-        cursor.execute(query, params)
-
-        return [dict(row) for row in cursor.fetchall()]
+        return [dict(row) for row in self.iter_trades_by_token(asset_id, start_time, end_time)]
 
     def get_market_summary(self, market_id: str) -> Dict:
         """
@@ -361,36 +808,67 @@ class TickDatabase:
             Dictionary with summary stats:
                 - total_trades: Total number of trades
                 - total_volume: Sum of trade sizes
-                - oldest_trade: Earliest timestamp
-                - newest_trade: Latest timestamp
+                - oldest_trade: Earliest timestamp (ISO 8601)
+                - newest_trade: Latest timestamp (ISO 8601)
                 - sources: Dict of trade counts by source
         """
-        cursor = self.conn.cursor()
-
-        # Basic stats
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total_trades,
-                SUM(size) as total_volume,
-                MIN(timestamp) as oldest_trade,
-                MAX(timestamp) as newest_trade
-            FROM trades
-            WHERE market_id = ?
+        cursor = self._reader().cursor()
+        cursor.row_factory = None  # Plain tuples; unpacked directly below
+
+        # Answered from the trades_1m rollups, not the raw trades
+        cursor.execute(f"""
+            SELECT COALESCE(SUM(trades), 0), SUM(volume), MIN(first_ts), MAX(last_ts),
+                   SUM(websocket_trades)
+            FROM trades_1m
+            WHERE market_pk = {_MARKET_PK_SQL}
         """, (market_id,))
 
-        stats = dict(cursor.fetchone())
+        total_trades, total_volume, oldest, newest, websocket_trades = cursor.fetchone()
 
-        # Count by source
-        cursor.execute("""
-            SELECT source, COUNT(*) as count
-            FROM trades
-            WHERE market_id = ?
-            GROUP BY source
-        """, (market_id,))
+        # Count by source (the CHECK constraint allows only these two)
+        sources = {'websocket': websocket_trades, 'rest_api': total_trades - (websocket_trades or 0)}
+
+        return {
+            'total_trades': total_trades,
+            'total_volume': total_volume,
+            'oldest_trade': epoch_ns_to_iso(oldest) if oldest is not None else None,
+            'newest_trade': epoch_ns_to_iso(newest) if newest is not None else None,
+            'sources': {source: count for source, count in sources.items() if count}
+        }
+
+    def get_minute_bars(self, market_id: str,
+                        start_time: Optional[str] = None,
+                        end_time: Optional[str] = None) -> List[Dict]:
+        """
+        Get one-minute OHLCV bars for a market from the trades_1m rollups.
+
+        Args:
+            market_id: Market ID
+            start_time: ISO 8601 timestamp or epoch nanoseconds (inclusive, floored to the minute)
+            end_time: ISO 8601 timestamp or epoch nanoseconds (exclusive)
+
+        Returns:
+            List of bar dictionaries (bucket start as epoch nanoseconds in 'timestamp')
+            sorted by time
+        """
+        query = f"""
+            SELECT bucket * {NS_PER_MINUTE} AS timestamp, open, high, low, close, volume, trades
+            FROM trades_1m
+            WHERE market_pk = {_MARKET_PK_SQL}
+        """
+        params = [market_id]
+
+        if start_time:
+            query += " AND bucket >= ?"
+            params.append(to_epoch_ns(start_time) // NS_PER_MINUTE)
 
-        stats['sources'] = {row['source']: row['count'] for row in cursor.fetchall()}
+        if end_time:
+            query += " AND bucket < ?"
+            params.append(-(-to_epoch_ns(end_time) // NS_PER_MINUTE))  # Ceiling division
+
+        query += " ORDER BY bucket ASC"
 
-        return stats
+        return [dict(row) for row in self._reader().execute(query, params)]
 
     def list_markets(self, closed: Optional[bool] = None) -> List[Dict]:
         """
@@ -402,7 +880,7 @@ class TickDatabase:
         Returns:
             List of market dictionaries
         """
-        cursor = self.conn.cursor()
+        cursor = self._reader().cursor()
 
         if closed is None:
             cursor.execute("SELECT * FROM markets ORDER BY last_updated DESC")
@@ -429,39 +907,96 @@ class TickDatabase:
         Returns:
             Number of trades exported
         """
-        trades = self.get_trades_by_market(market_id)
+        # Stream rows straight from the cursor; value is computed by SQLite
+        cursor = self._reader().cursor()
+        cursor.execute("""
+            SELECT timestamp_iso, market_id, asset_id, side, outcome,
+                   price, size, printf('%.4f', price * size), fee_rate_bps, source
+            FROM trades_v
+            WHERE market_id = ?
+            ORDER BY timestamp ASC, id ASC
+        """, (market_id,))
 
-        if not trades:
+        rows = cursor.fetchmany(_EXPORT_FETCH_SIZE)
+
+        if not rows:
             return 0
 
+        exported = 0
         with open(output_path, 'w', newline='') as f:
-            fieldnames = [
+            writer = csv.writer(f)
+            writer.writerow([
                 'timestamp', 'market_id', 'asset_id', 'side', 'outcome',
                 'price', 'size', 'value', 'fee_rate_bps', 'source'
-            ]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for trade in trades:
-                # Calculate trade value
-                value = trade['price'] * trade['size']
-
-                writer.writerow({
-                    'timestamp': trade['timestamp'],
-                    'market_id': trade['market_id'],
-                    'asset_id': trade['asset_id'],
-                    'side': trade['side'],
-                    'outcome': trade.get('outcome', ''),
-                    'price': trade['price'],
-                    'size': trade['size'],
-                    'value': f"{value:.4f}",
-                    'fee_rate_bps': trade.get('fee_rate_bps', ''),
-                    'source': trade['source']
-                })
-
-        return len(trades)
-
-    def get_latest_trade_timestamp(self, asset_id: str) -> Optional[str]:
+            ])
+
+            while rows:
+                writer.writerows(rows)
+                exported += len(rows)
+                rows = cursor.fetchmany(_EXPORT_FETCH_SIZE)
+
+        return exported
+
+    def export_to_parquet(self, market_id: str, output_path: str,
+                          compression: str = 'zstd') -> int:
+        """
+        Export trades for a market to a Parquet file (requires pyarrow).
+
+        Same columns as export_to_csv, but typed: timestamp is a UTC
+        nanosecond timestamp and value a float. Rows are streamed in
+        batches, and repeated strings are dictionary-encoded.
+
+        Args:
+            market_id: Market ID
+            output_path: Path to output Parquet file
+            compression: Parquet codec ('zstd', 'lz4', 'snappy', ...)
+
+        Returns:
+            Number of trades exported
+        """
+        if pa is None:
+            raise ImportError("pyarrow not installed. Run: pip install pyarrow")
+
+        schema = pa.schema([
+            ('timestamp', pa.timestamp('ns', tz='UTC')),
+            ('market_id', pa.string()),
+            ('asset_id', pa.string()),
+            ('side', pa.string()),
+            ('outcome', pa.string()),
+            ('price', pa.float64()),
+            ('size', pa.float64()),
+            ('value', pa.float64()),
+            ('fee_rate_bps', pa.int32()),
+            ('source', pa.string())
+        ])
+
+        cursor = self._reader().cursor()
+        cursor.row_factory = None  # Plain tuples, transposed into columns below
+        cursor.execute("""
+            SELECT timestamp, market_id, asset_id, side, outcome,
+                   price, size, price * size, fee_rate_bps, source
+            FROM trades_v
+            WHERE market_id = ?
+            ORDER BY timestamp ASC, id ASC
+        """, (market_id,))
+
+        rows = cursor.fetchmany(_PARQUET_BATCH_SIZE)
+
+        if not rows:
+            return 0
+
+        exported = 0
+        with pq.ParquetWriter(output_path, schema, compression=compression) as writer:
+            while rows:
+                arrays = [pa.array(column, type=field.type)
+                          for column, field in zip(zip(*rows), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                exported += len(rows)
+                rows = cursor.fetchmany(_PARQUET_BATCH_SIZE)
+
+        return exported
+
+    def get_latest_trade_timestamp(self, asset_id: str) -> Optional[int]:
         """
         Get timestamp of most recent trade for a token.
 
@@ -471,21 +1006,26 @@ class TickDatabase:
             asset_id: Token ID
 
         Returns:
-            ISO 8601 timestamp or None if no trades found
+            Epoch nanoseconds or None if no trades found
         """
-        cursor = self.conn.cursor()
+        cursor = self._reader().cursor()
 
         cursor.execute("""
             SELECT MAX(timestamp) as latest
             FROM trades
-            WHERE asset_id = ?
+            WHERE asset_pk = (SELECT asset_pk FROM assets WHERE asset_id = ?)
         """, (asset_id,))
 
         row = cursor.fetchone()
         return row['latest'] if row['latest'] else None
 
     def close(self):
-        """Close database connection."""
+        """Close database connections."""
+        with self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+
         if self.conn:
             self.conn.close()
 
@@ -9,16 +9,32 @@ Usage:
     recorder.start_recording()  # Runs until stopped with Ctrl+C
 """
 
+import queue
 import signal
 import sys
+import threading
 import time
+from operator import attrgetter
 from typing import List, Dict, Optional
 from datetime import datetime, timezone
 
-from websocket_client import MarketWebSocketClient
-from tick_database import TickDatabase
+from websocket_client import MarketWebSocketClient, TradeRecord
+from tick_database import TickDatabase, SIDE_CODES, SOURCE_CODES
+from time_utils import to_epoch_ns
 from api_client import PolymarketAPIClient
-from config import TICK_DB_PATH
+from config import (
+    TICK_DB_PATH, TICK_BATCH_COMMIT_SIZE, TICK_FLUSH_INTERVAL,
+    TICK_WAL_CHECKPOINT_INTERVAL
+)
+
+
+# Queued after the last trade to stop the writer thread
+_STOP = object()
+
+# WebSocket trade fields copied into each row (already typed by the client)
+_WS_TRADE_FIELDS = attrgetter('side', 'price', 'size', 'fee_rate_bps', 'timestamp')
+
+_SOURCE_WEBSOCKET = SOURCE_CODES['websocket']
 
 
 class TickRecorder:
@@ -39,15 +55,24 @@ class TickRecorder:
         self.ws_client: Optional[MarketWebSocketClient] = None
         self.api_client = PolymarketAPIClient()
 
-        # Token-to-market mapping: token_id -> (market_id, outcome)
+        # Token-to-market mapping: token_id -> (market_pk, asset_pk, outcome),
+        # holding the integer keys trades are stored under
         self.token_map: Dict[str, tuple] = {}
 
+        # ID -> integer key memos (filled before recording starts)
+        self._market_pks: Dict[str, int] = {}
+        self._asset_pks: Dict[str, int] = {}
+
         # Market metadata cache
         self.markets_metadata: Dict[str, Dict] = {}
 
         # Running flag
         self.running = False
 
+        # Lists of trade rows handed from the WebSocket client to the writer thread
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+
         # Stats
         self.trades_recorded = 0
         self.start_time: Optional[datetime] = None
@@ -100,9 +125,10 @@ class TickRecorder:
                     'closed_time': market.get('closedTime')
                 }
 
-                # Build token mapping
-                self.token_map[token_up] = (market_id, outcome_up)
-                self.token_map[token_down] = (market_id, outcome_down)
+                # Build token mapping (interned: the same IDs are probed per trade)
+                market_pk = self._intern_market(market_id)
+                self.token_map[sys.intern(token_up)] = (market_pk, self._intern_asset(token_up), outcome_up)
+                self.token_map[sys.intern(token_down)] = (market_pk, self._intern_asset(token_down), outcome_down)
 
                 print(f"  ✓ {market.get('question', '')[:60]}")
                 print(f"    Outcomes: {outcome_up} / {outcome_down}")
@@ -115,6 +141,20 @@ class TickRecorder:
         print(f"\nTotal markets loaded: {len(self.markets_metadata)}")
         print(f"Total tokens to monitor: {len(self.token_map)}")
 
+    def _intern_market(self, market_id: str) -> int:
+        """Get the database key for a market ID (memoized)."""
+        market_pk = self._market_pks.get(market_id)
+        if market_pk is None:
+            market_pk = self._market_pks[market_id] = self.db.market_pk(market_id)
+        return market_pk
+
+    def _intern_asset(self, asset_id: str) -> int:
+        """Get the database key for a token ID (memoized)."""
+        asset_pk = self._asset_pks.get(asset_id)
+        if asset_pk is None:
+            asset_pk = self._asset_pks[asset_id] = self.db.asset_pk(asset_id)
+        return asset_pk
+
     def _save_market_metadata(self):
         """Save market metadata to database."""
         print("\nSaving market metadata to database...")
@@ -127,53 +167,99 @@ class TickRecorder:
 
         print("  ✓ Market metadata saved")
 
-    def _on_trade(self, trade: Dict):
+    def _on_trades(self, trades: List[TradeRecord]):
         """
-        Callback for WebSocket trade events.
+        Callback for batches of WebSocket trade events.
 
-        Enriches trade with market/outcome info and saves to database.
+        Enriches trades with market/outcome info and queues them for the
+        writer thread as one list.
 
         Args:
-            trade: Trade data from WebSocket
+            trades: Trades from WebSocket, in arrival order
         """
-        try:
-            asset_id = trade.get('asset_id', '')
-
-            # Look up market and outcome
-            if asset_id not in self.token_map:
-                # Unknown token - skip
-                return
-
-            market_id, outcome = self.token_map[asset_id]
-
-            # Prepare trade data for database
-            trade_data = {
-                'market_id': market_id,
-                'asset_id': asset_id,
-                'side': trade.get('side', ''),
-                'outcome': outcome,
-                'price': float(trade.get('price', 0)),
-                'size': float(trade.get('size', 0)),
-                'fee_rate_bps': int(trade.get('fee_rate_bps', 0)) if trade.get('fee_rate_bps') else None,
-                'timestamp': trade.get('timestamp', ''),
-                'source': 'websocket'
-            }
-
-            # Insert into database
-            inserted = self.db.insert_trade(trade_data)
-
-            if inserted:
-                self.trades_recorded += 1
-
-                # Periodic status updates
-                if self.trades_recorded % 10 == 0:
-                    elapsed = (datetime.now(timezone.utc) - self.start_time).total_seconds()
-                    rate = self.trades_recorded / elapsed if elapsed > 0 else 0
-                    print(f"  ✓ {self.trades_recorded} trades recorded "
-                          f"({rate:.1f} trades/sec)")
+        rows = []
+        token_map = self.token_map
+        recorded_at = time.time_ns()
+
+        for trade in trades:
+            try:
+                # Look up market and outcome (one probe)
+                entry = token_map.get(trade.asset_id)
+                if entry is None:
+                    # Unknown token - skip
+                    continue
 
+                market_pk, asset_pk, outcome = entry
+
+                # Build the row directly (column order of TickDatabase.trade_row)
+                side, price, size, fee_rate_bps, timestamp = _WS_TRADE_FIELDS(trade)
+                rows.append((
+                    market_pk, asset_pk, SIDE_CODES[side], outcome, price, size,
+                    fee_rate_bps, to_epoch_ns(timestamp), _SOURCE_WEBSOCKET,
+                    recorded_at
+                ))
+
+            except Exception as e:
+                print(f"  ⚠️  Error recording trade: {e}")
+
+        # Hand off to the writer thread; never block the WebSocket on I/O
+        if rows:
+            self._queue.put(rows)
+
+    def _writer_loop(self):
+        """
+        Drain queued trade rows and commit them in batches (writer thread).
+
+        A batch is committed once it reaches TICK_BATCH_COMMIT_SIZE rows or
+        TICK_FLUSH_INTERVAL seconds after its first row, whichever is first.
+        """
+        get = self._queue.get
+        stopping = False
+
+        while not stopping:
+            batch = get()
+            if batch is _STOP:
+                break
+
+            rows = batch
+            deadline = time.monotonic() + TICK_FLUSH_INTERVAL
+
+            while len(rows) < TICK_BATCH_COMMIT_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch = get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if batch is _STOP:
+                    stopping = True
+                    break
+                rows += batch
+
+            self._save_rows(rows)
+
+    def _save_rows(self, rows: List[tuple]):
+        """Commit a batch of trade rows in one transaction."""
+        try:
+            inserted = self.db.insert_trades_fast(rows)
         except Exception as e:
-            print(f"  ⚠️  Error recording trade: {e}")
+            print(f"  ⚠️  Error saving {len(rows)} trades: {e}")
+            return
+
+        previous = self.trades_recorded
+        self.trades_recorded += inserted
+
+        # Periodic status updates
+        if self.trades_recorded // 10 > previous // 10:
+            elapsed = (datetime.now(timezone.utc) - self.start_time).total_seconds()
+            rate = self.trades_recorded / elapsed if elapsed > 0 else 0
+            print(f"  ✓ {self.trades_recorded} trades recorded "
+                  f"({rate:.1f} trades/sec)")
+
+        # Keep the WAL file from growing without bound
+        if self.trades_recorded // TICK_WAL_CHECKPOINT_INTERVAL > previous // TICK_WAL_CHECKPOINT_INTERVAL:
+            self.db.checkpoint()
 
     def _on_error(self, error: Exception):
         """Callback for WebSocket errors."""
@@ -222,10 +308,14 @@ class TickRecorder:
         # Initialize WebSocket client
         self.ws_client = MarketWebSocketClient(
             asset_ids=token_ids,
-            on_trade_callback=self._on_trade,
-            on_error_callback=self._on_error
+            on_trade_batch=self._on_trades,
+            on_error=self._on_error
         )
 
+        # Single writer thread owns all trade inserts
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
         # Connect and start receiving trades
         try:
             self.ws_client.connect()
@@ -257,6 +347,11 @@ class TickRecorder:
 
         # Close database
         if self.db:
+            if self._writer:
+                print("  Flushing queued trades...")
+                self._queue.put(_STOP)
+                self._writer.join()
+
             print("  Closing database...")
             self.db.close()
 
@@ -13,13 +13,41 @@ import argparse
 import sys
 import csv
 from datetime import datetime
+from itertools import chain, islice
+from operator import itemgetter
 from pathlib import Path
 
+import pandas as pd
+
 from tick_database import TickDatabase
 from tick_recorder import TickRecorder
 from config import TICK_DB_PATH, CACHE_FILE
 
 
+# Columns written by _export_trades_to_csv (same layout as TickDatabase.export_to_csv)
+_TRADE_CSV_HEADER = (
+    'timestamp', 'market_id', 'asset_id', 'side', 'outcome',
+    'price', 'size', 'value', 'fee_rate_bps', 'source'
+)
+_TRADE_CSV_FIELDS = itemgetter(
+    'timestamp_iso', 'market_id', 'asset_id', 'side', 'outcome',
+    'price', 'size', 'fee_rate_bps', 'source'
+)
+_CSV_BUFFER_SIZE = 1 << 20  # Large sequential writes for streamed exports
+_CSV_BATCH_SIZE = 10_000
+
+# Table layouts for cmd_list and cmd_query
+_RULE = "-" * 100
+_MARKET_HEADER = "{:<10} {:<50} {:<10} {:<25}".format('Market ID', 'Question', 'Status', 'Last Updated')
+_format_market_row = "{:<10} {:<50} {:<10} {:<25}".format
+_TRADE_HEADER = "{:<25} {:<6} {:<10} {:<10} {:<12} {:<10}".format(
+    'Timestamp', 'Side', 'Outcome', 'Price', 'Size', 'Value')
+_format_trade_row = "{:<25} {:<6} {:<10} {:<10.4f} {:<12.2f} {:<10.2f}".format
+
+# Trade fields shown by `query` (always present in TickDatabase rows)
+_TRADE_DISPLAY_FIELDS = itemgetter('timestamp_iso', 'side', 'outcome', 'price', 'size')
+
+
 def cmd_record(args):
     """Start recording trades for specified markets."""
     market_ids = []
@@ -33,19 +61,17 @@ def cmd_record(args):
         print(f"Loading markets from cache: {CACHE_FILE}")
 
         try:
-            with open(CACHE_FILE) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Apply filters
-                    if args.filter_unresolved and row.get('closed') == 'True':
-                        continue
+            # Parse once and filter with column masks instead of per-row Python
+            df = pd.read_csv(CACHE_FILE, usecols=['id', 'closed', 'volume'],
+                             dtype={'id': str, 'closed': str})
 
-                    if args.min_volume:
-                        volume = float(row.get('volume', 0))
-                        if volume < args.min_volume:
-                            continue
+            mask = pd.Series(True, index=df.index)
+            if args.filter_unresolved:
+                mask &= df['closed'].ne('True')
+            if args.min_volume:
+                mask &= df['volume'].astype(float) >= args.min_volume
 
-                    market_ids.append(row['id'])
+            market_ids = df.loc[mask, 'id'].tolist()
 
             print(f"Found {len(market_ids)} markets matching filters")
 
@@ -86,67 +112,69 @@ def cmd_query(args):
     """Query trades from database."""
     db = TickDatabase(args.db_path)
 
+    # Trades are streamed from the cursor, never held in memory as a whole
     if args.market_id:
         # Query by market
-        trades = db.get_trades_by_market(
+        trades = db.iter_trades_by_market(
             args.market_id,
             start_time=args.start_time,
             end_time=args.end_time,
             outcome=args.outcome
         )
-
-        print(f"Found {len(trades)} trades for market {args.market_id}")
+        label = f"market {args.market_id}"
 
     elif args.token_id:
         # Query by token
-        trades = db.get_trades_by_token(
+        trades = db.iter_trades_by_token(
             args.token_id,
             start_time=args.start_time,
             end_time=args.end_time
         )
-
-        print(f"Found {len(trades)} trades for token {args.token_id[:20]}...")
+        label = f"token {args.token_id[:20]}..."
 
     else:
         print("Error: Must specify --market-id or --token-id")
         db.close()
         sys.exit(1)
 
-    if not trades:
+    first = next(trades, None)
+    if first is None:
+        print(f"Found 0 trades for {label}")
         print("No trades found")
         db.close()
         return
+    trades = chain((first,), trades)
 
     # Display trades
     if args.output:
         # Export to CSV
         count = _export_trades_to_csv(trades, args.output)
+        print(f"Found {count} trades for {label}")
         print(f"Exported {count} trades to {args.output}")
     else:
+        shown = list(islice(trades, 50))
+        total = len(shown) + sum(1 for _ in trades)
+        print(f"Found {total} trades for {label}")
+
         # Display to terminal
         print("\nRecent trades:")
-        print("-" * 100)
-        print(f"{'Timestamp':<25} {'Side':<6} {'Outcome':<10} {'Price':<10} {'Size':<12} {'Value':<10}")
-        print("-" * 100)
+        rows = [_RULE, _TRADE_HEADER, _RULE]
 
-        for trade in trades[:50]:  # Limit display to 50
-            timestamp = trade.get('timestamp', '')[:19]  # Trim milliseconds
-            side = trade.get('side', '')
-            outcome = trade.get('outcome', '')
-            price = trade.get('price', 0)
-            size = trade.get('size', 0)
-            value = price * size
+        # Limit display to 50; timestamps trimmed to whole seconds
+        for timestamp, side, outcome, price, size in map(_TRADE_DISPLAY_FIELDS, shown):
+            rows.append(_format_trade_row(timestamp[:19], side, outcome or '',
+                                          price, size, price * size))
 
-            print(f"{timestamp:<25} {side:<6} {outcome:<10} {price:<10.4f} {size:<12.2f} {value:<10.2f}")
+        if total > 50:
+            rows.append(f"... and {total - 50} more trades")
 
-        if len(trades) > 50:
-            print(f"... and {len(trades) - 50} more trades")
+        sys.stdout.write("\n".join(rows) + "\n")
 
     db.close()
 
 
 def cmd_export(args):
-    """Export trades to CSV."""
+    """Export trades to CSV or Parquet."""
     db = TickDatabase(args.db_path)
 
     if not args.market_id:
@@ -155,7 +183,15 @@ def cmd_export(args):
         sys.exit(1)
 
     # Use database's built-in export
-    count = db.export_to_csv(args.market_id, args.output)
+    if args.format == 'parquet':
+        try:
+            count = db.export_to_parquet(args.market_id, args.output)
+        except ImportError as e:
+            print(f"Error: {e}")
+            db.close()
+            sys.exit(1)
+    else:
+        count = db.export_to_csv(args.market_id, args.output)
 
     if count > 0:
         print(f"✓ Exported {count} trades to {args.output}")
@@ -177,17 +213,18 @@ def cmd_list(args):
         return
 
     print(f"\nFound {len(markets)} markets:\n")
-    print("-" * 100)
-    print(f"{'Market ID':<10} {'Question':<50} {'Status':<10} {'Last Updated':<25}")
-    print("-" * 100)
+    rows = [_RULE, _MARKET_HEADER, _RULE]
 
     for market in markets:
-        market_id = market.get('market_id', '')
-        question = market.get('question', '')[:47] + "..." if len(market.get('question', '')) > 50 else market.get('question', '')
-        status = "Closed" if market.get('closed') else "Open"
-        last_updated = market.get('last_updated', '')[:19]
+        question = market['question'] or ''
+        if len(question) > 50:
+            question = question[:47] + "..."
+        status = "Closed" if market['closed'] else "Open"
+
+        rows.append(_format_market_row(market['market_id'], question, status,
+                                       (market['last_updated'] or '')[:19]))
 
-        print(f"{market_id:<10} {question:<50} {status:<10} {last_updated:<25}")
+    sys.stdout.write("\n".join(rows) + "\n")
 
     db.close()
 
@@ -247,31 +284,26 @@ def cmd_summary(args):
 
 
 def _export_trades_to_csv(trades, output_path):
-    """Helper to export trades to CSV."""
-    with open(output_path, 'w', newline='') as f:
-        fieldnames = [
-            'timestamp', 'market_id', 'asset_id', 'side', 'outcome',
-            'price', 'size', 'value', 'fee_rate_bps', 'source'
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for trade in trades:
-            value = trade['price'] * trade['size']
-            writer.writerow({
-                'timestamp': trade['timestamp'],
-                'market_id': trade['market_id'],
-                'asset_id': trade['asset_id'],
-                'side': trade['side'],
-                'outcome': trade.get('outcome', ''),
-                'price': trade['price'],
-                'size': trade['size'],
-                'value': f"{value:.4f}",
-                'fee_rate_bps': trade.get('fee_rate_bps', ''),
-                'source': trade['source']
-            })
-
-    return len(trades)
+    """Helper to export trades (any iterable of trade rows) to CSV; returns the count."""
+    fields = map(_TRADE_CSV_FIELDS, trades)
+    count = 0
+
+    with open(output_path, 'w', newline='', buffering=_CSV_BUFFER_SIZE) as f:
+        writer = csv.writer(f)
+        writer.writerow(_TRADE_CSV_HEADER)
+
+        # One tuple per row (None is written as an empty field), in batches
+        # so rows can come straight from a database cursor
+        while batch := list(islice(fields, _CSV_BATCH_SIZE)):
+            writer.writerows(
+                (timestamp, market_id, asset_id, side, outcome, price, size,
+                 f"{price * size:.4f}", fee_rate_bps, source)
+                for timestamp, market_id, asset_id, side, outcome, price, size, fee_rate_bps, source
+                in batch
+            )
+            count += len(batch)
+
+    return count
 
 
 def main():
@@ -309,9 +341,11 @@ def main():
     query_parser.add_argument('--output', help='Export to CSV file')
 
     # Export command
-    export_parser = subparsers.add_parser('export', help='Export trades to CSV')
+    export_parser = subparsers.add_parser('export', help='Export trades to CSV or Parquet')
     export_parser.add_argument('--market-id', required=True, help='Market ID')
-    export_parser.add_argument('--output', required=True, help='Output CSV file')
+    export_parser.add_argument('--output', required=True, help='Output file')
+    export_parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                              help='Output format (default: csv; parquet needs pyarrow)')
 
     # List command
     list_parser = subparsers.add_parser('list', help='List markets in database')
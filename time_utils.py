@@ -0,0 +1,55 @@
+"""
+Timestamp parsing shared by the trade scripts
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+try:
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:  # Optional: faster ISO 8601 parsing when installed
+    _parse_iso = datetime.fromisoformat
+
+
+@lru_cache(maxsize=4096)
+def parse_trade_ts(ts, _fromts=datetime.fromtimestamp, _fromiso=_parse_iso, _utc=timezone.utc) -> datetime:
+    """
+    Parse a trade timestamp.
+
+    Accepts Unix seconds or milliseconds (returned as UTC) and ISO 8601
+    strings, including a trailing 'Z'. Memoized since trade batches repeat
+    timestamps at second granularity.
+    """
+    if ts.__class__ is int or ts.__class__ is float:
+        return _fromts(ts / 1000 if ts > 1e12 else ts, _utc)
+    return _fromiso(ts)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_ns(ts) -> int:
+    """
+    Convert a trade timestamp to integer nanoseconds since the Unix epoch.
+
+    Accepts datetimes, ISO 8601 strings (naive values are taken as UTC) and
+    Unix seconds, milliseconds or nanoseconds as numbers or numeric strings.
+    """
+    if ts.__class__ is str and ts.isdigit():
+        ts = int(ts)
+
+    if ts.__class__ is int or ts.__class__ is float:
+        if ts > 1e17:
+            return int(ts)  # Already nanoseconds
+        if ts > 1e12:
+            return int(round(ts * 1000)) * 1000  # Milliseconds
+        return int(round(ts * 1_000_000)) * 1000  # Seconds
+
+    dt = ts if isinstance(ts, datetime) else _parse_iso(ts)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def epoch_ns_to_iso(ns: int) -> str:
+    """Format epoch nanoseconds as an ISO 8601 UTC string."""
+    return (_EPOCH + timedelta(microseconds=ns // 1000)).isoformat()
@@ -6,22 +6,49 @@ Provides real-time orderbook updates, price changes, and trade events
 via the public Market Channel (no authentication required).
 """
 import json
+import queue
+import sys
 import threading
 import time
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional
 from collections import deque
+from itertools import islice
 from datetime import datetime, timezone
 
 try:
-    from websocket import WebSocketApp, WebSocketException
+    from websocket import ABNF, WebSocketApp, WebSocketException
 except ImportError:
     print("Error: websocket-client not installed. Run: pip install websocket-client")
     raise
 
+from json_utils import json_loads, json_dumps_bytes
+
 
 # WebSocket endpoint
 WSS_URL = "wss://ws-subscriptions-clob.polymarket.com"
 MARKET_CHANNEL = "market"
+PING_INTERVAL = 10  # Seconds between keep-alive pings
+TRADE_BATCH_SIZE = 256  # Default max trades per on_trade_batch call
+_PING_FRAME = b"PING"  # Application-level ping, sent as a text frame
+
+# Raw-frame markers for the price_change fast path in _on_message
+_PRICE_CHANGE_MARKER = b'"price_change"'
+_TRADE_MARKER = b'"last_trade_price"'
+_BOOK_MARKER = b'"book"'
+
+# Queued after the last message to stop the dispatch thread
+_STOP = object()
+
+
+class TradeRecord(NamedTuple):
+    """A last_trade_price event with typed fields (one per trade)."""
+    asset_id: str
+    price: float
+    size: float
+    side: str
+    fee_rate_bps: Optional[int]
+    timestamp: str  # Unix milliseconds, as sent by the server
+    market: str
 
 
 class MarketWebSocketClient:
@@ -40,12 +67,14 @@ class MarketWebSocketClient:
         asset_ids: List[str],
         on_book: Optional[Callable[[Dict], None]] = None,
         on_price_change: Optional[Callable[[Dict], None]] = None,
-        on_trade: Optional[Callable[[Dict], None]] = None,
+        on_trade: Optional[Callable[[TradeRecord], None]] = None,
+        on_trade_batch: Optional[Callable[[List[TradeRecord]], None]] = None,
         on_tick_size_change: Optional[Callable[[Dict], None]] = None,
         on_error: Optional[Callable[[Exception], None]] = None,
         on_connected: Optional[Callable[[], None]] = None,
         on_disconnected: Optional[Callable[[], None]] = None,
         max_trades_history: int = 100,
+        trade_batch_size: int = TRADE_BATCH_SIZE,
         verbose: bool = False
     ):
         """
@@ -55,23 +84,44 @@ class MarketWebSocketClient:
             asset_ids: List of token IDs (asset IDs) to subscribe to
             on_book: Callback for orderbook updates
             on_price_change: Callback for price change events
-            on_trade: Callback for trade events (last_trade_price)
+            on_trade: Callback for trade events (last_trade_price), called with a TradeRecord
+            on_trade_batch: Callback for trades in bulk, called with a list of TradeRecords
             on_tick_size_change: Callback for tick size changes
             on_error: Callback for errors
             on_connected: Callback when connected
             on_disconnected: Callback when disconnected
             max_trades_history: Max trades to keep in history
+            trade_batch_size: Max trades per on_trade_batch call
             verbose: Print debug messages
         """
         self.asset_ids = asset_ids
         self.on_book_callback = on_book
         self.on_price_change_callback = on_price_change
         self.on_trade_callback = on_trade
+        self.on_trade_batch_callback = on_trade_batch
         self.on_tick_size_change_callback = on_tick_size_change
         self.on_error_callback = on_error
         self.on_connected_callback = on_connected
         self.on_disconnected_callback = on_disconnected
         self.verbose = verbose
+        self.trade_batch_size = trade_batch_size
+        
+        # event_type -> handler, one dict lookup per message
+        self._event_handlers: Dict[str, Callable[[Dict], None]] = {
+            "book": self._handle_book_event,
+            "price_change": self._handle_price_change_event,
+            "last_trade_price": self._handle_trade_event,
+            "tick_size_change": self._handle_tick_size_change_event
+        }
+        
+        # Trades waiting for the next on_trade_batch call (dispatch thread only)
+        self._trade_batch: List[TradeRecord] = []
+        
+        # The subscription never changes, so encode it once for every (re)connect
+        self._subscribe_frame = json_dumps_bytes({
+            "assets_ids": asset_ids,
+            "type": MARKET_CHANNEL
+        })
         
         self.ws: Optional[WebSocketApp] = None
         self.ws_thread: Optional[threading.Thread] = None
@@ -79,13 +129,19 @@ class MarketWebSocketClient:
         self.running = False
         self.connected = False
         
-        # Data storage
+        # Data storage. No lock: only the dispatch thread writes these, and
+        # single dict stores / deque.appendleft are atomic under the GIL,
+        # so readers always see a whole record
         self.orderbooks: Dict[str, Dict] = {}  # asset_id -> {bids, asks}
         self.trades_history: deque = deque(maxlen=max_trades_history)
-        self.last_prices: Dict[str, Dict] = {}  # asset_id -> {price, side, size, timestamp}
+        self.last_prices: Dict[str, TradeRecord] = {}  # asset_id -> latest trade
         
-        # Thread safety
-        self._lock = threading.Lock()
+        # Raw frames handed from the socket thread to the dispatch thread
+        self._messages: queue.SimpleQueue = queue.SimpleQueue()
+        self._dispatch_thread: Optional[threading.Thread] = None
+
+        # Set by disconnect() to wake the ping thread immediately
+        self._stop_event = threading.Event()
     
     def _log(self, message: str):
         """Log message if verbose mode enabled."""
@@ -97,12 +153,9 @@ class MarketWebSocketClient:
         """Handle WebSocket connection opened."""
         self._log("Connection opened, subscribing to assets...")
         
-        # Subscribe to market channel with asset IDs
-        subscribe_msg = {
-            "assets_ids": self.asset_ids,
-            "type": MARKET_CHANNEL
-        }
-        ws.send(json.dumps(subscribe_msg))
+        # Subscribe to market channel with asset IDs. The frame is already
+        # UTF-8 bytes; the server only accepts text frames, hence the opcode
+        ws.send(self._subscribe_frame, ABNF.OPCODE_TEXT)
         self._log(f"Subscribed to {len(self.asset_ids)} asset(s)")
         
         self.connected = True
@@ -114,29 +167,72 @@ class MarketWebSocketClient:
         if self.on_connected_callback:
             self.on_connected_callback()
     
-    def _on_message(self, ws, message: str):
-        """Handle incoming WebSocket message."""
+    def _on_message(self, ws, message: bytes):
+        """Handle incoming WebSocket message (socket thread: queue only)."""
         # Handle PONG responses
-        if message == "PONG":
+        if message == b"PONG":
             self._log("Received PONG")
             return
         
+        # price_change is by far the most frequent event and only feeds
+        # on_price_change, so without that callback drop it with a byte
+        # search instead of decoding it (frames can batch several events,
+        # so keep any that also carry a book or trade)
+        if (self.on_price_change_callback is None and _PRICE_CHANGE_MARKER in message
+                and _TRADE_MARKER not in message and _BOOK_MARKER not in message):
+            return
+
+        # Decoding and callbacks run on the dispatch thread so slow
+        # handlers never hold up reads or pings
+        self._messages.put(message)
+    
+    def _dispatch_loop(self):
+        """
+        Decode and dispatch queued messages until stopped (dispatch thread).
+        
+        A single thread keeps events in arrival order, so a book snapshot
+        is never applied after a later update for the same asset.
+        """
+        get = self._messages.get
+        while True:
+            message = get()
+            if message is _STOP:
+                break
+            self._dispatch_message(message)
+            
+            # Batch trades while more messages are already waiting; flush as
+            # soon as the queue is drained, so batching never adds latency
+            if self._trade_batch and (len(self._trade_batch) >= self.trade_batch_size
+                                      or self._messages.empty()):
+                self._flush_trade_batch()
+        
+        if self._trade_batch:
+            self._flush_trade_batch()
+    
+    def _flush_trade_batch(self):
+        """Hand buffered trades to on_trade_batch."""
+        trades = self._trade_batch
+        self._trade_batch = []
+        try:
+            self.on_trade_batch_callback(trades)
+        except Exception as e:
+            self._log(f"Error processing trade batch: {e}")
+            if self.on_error_callback:
+                self.on_error_callback(e)
+    
+    def _dispatch_message(self, message: bytes):
+        """Decode one message and route it to its event handler."""
         try:
-            data = json.loads(message)
+            data = json_loads(message)
             event_type = data.get("event_type", "")
             
             # Don't log price_change events - too frequent
-            if event_type != "price_change":
+            if self.verbose and event_type != "price_change":
                 self._log(f"Received event: {event_type}")
             
-            if event_type == "book":
-                self._handle_book_event(data)
-            elif event_type == "price_change":
-                self._handle_price_change_event(data)
-            elif event_type == "last_trade_price":
-                self._handle_trade_event(data)
-            elif event_type == "tick_size_change":
-                self._handle_tick_size_change_event(data)
+            handler = self._event_handlers.get(event_type)
+            if handler is not None:
+                handler(data)
             else:
                 self._log(f"Unknown event type: {event_type}")
                 
@@ -151,13 +247,12 @@ class MarketWebSocketClient:
         """Handle orderbook snapshot event."""
         asset_id = data.get("asset_id", "")
         
-        with self._lock:
-            self.orderbooks[asset_id] = {
-                "bids": data.get("bids", []),
-                "asks": data.get("asks", []),
-                "timestamp": data.get("timestamp", ""),
-                "hash": data.get("hash", "")
-            }
+        self.orderbooks[asset_id] = {
+            "bids": data.get("bids", []),
+            "asks": data.get("asks", []),
+            "timestamp": data.get("timestamp", ""),
+            "hash": data.get("hash", "")
+        }
         
         if self.on_book_callback:
             self.on_book_callback(data)
@@ -169,21 +264,43 @@ class MarketWebSocketClient:
     
     def _handle_trade_event(self, data: Dict):
         """Handle last_trade_price event (trade execution)."""
-        asset_id = data.get("asset_id", "")
+        # The same few IDs and sides repeat on every trade: interning keeps
+        # one shared copy each (the decoded duplicates are freed right away)
+        # and makes dict lookups keyed on them, like the recorder's
+        # token_map, hit on identity
+        asset_id = sys.intern(data.get("asset_id") or "")
         
-        trade_record = {
-            "asset_id": asset_id,
-            "price": data.get("price", "0"),
-            "size": data.get("size", "0"),
-            "side": data.get("side", ""),
-            "fee_rate_bps": data.get("fee_rate_bps", "0"),
-            "timestamp": data.get("timestamp", ""),
-            "market": data.get("market", "")
-        }
+        # Numeric fields arrive as strings; convert once here so callbacks
+        # get typed values (price/size: float, fee_rate_bps: int or None)
+        try:
+            price = float(data.get("price", 0))
+            size = float(data.get("size", 0))
+        except (TypeError, ValueError):
+            # A zero placeholder would be recorded as a real trade; drop it
+            self._log(f"Skipping trade with bad price/size: {data}")
+            return
+        
+        fee_rate_bps = data.get("fee_rate_bps")
+        try:
+            fee_rate_bps = int(float(fee_rate_bps)) if fee_rate_bps else None
+        except (TypeError, ValueError):
+            fee_rate_bps = None
+        
+        trade_record = TradeRecord(
+            asset_id,
+            price,
+            size,
+            sys.intern(data.get("side") or ""),
+            fee_rate_bps,
+            data.get("timestamp", ""),
+            sys.intern(data.get("market") or "")
+        )
         
-        with self._lock:
-            self.trades_history.appendleft(trade_record)
-            self.last_prices[asset_id] = trade_record
+        self.trades_history.appendleft(trade_record)
+        self.last_prices[asset_id] = trade_record
+        
+        if self.on_trade_batch_callback:
+            self._trade_batch.append(trade_record)
         
         if self.on_trade_callback:
             self.on_trade_callback(trade_record)
@@ -211,12 +328,14 @@ class MarketWebSocketClient:
         """Send periodic pings to keep connection alive."""
         while self.running and self.connected:
             try:
-                ws.send("PING")
+                ws.send(_PING_FRAME, ABNF.OPCODE_TEXT)
                 self._log("Sent PING")
             except Exception as e:
                 self._log(f"Ping failed: {e}")
                 break
-            time.sleep(10)  # Ping every 10 seconds
+            # Ping every 10 seconds; returns early once disconnect() is called
+            if self._stop_event.wait(PING_INTERVAL):
+                break
     
     def connect(self):
         """Connect to WebSocket server."""
@@ -225,8 +344,12 @@ class MarketWebSocketClient:
             return
         
         self.running = True
+        self._stop_event.clear()
         url = f"{WSS_URL}/ws/{MARKET_CHANNEL}"
         
+        self._dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatch_thread.start()
+        
         self._log(f"Connecting to {url}")
         
         self.ws = WebSocketApp(
@@ -237,34 +360,48 @@ class MarketWebSocketClient:
             on_close=self._on_close
         )
         
-        # Run WebSocket in separate thread
-        self.ws_thread = threading.Thread(target=self.ws.run_forever, daemon=True)
+        # Run WebSocket in separate thread. skip_utf8_validation hands text
+        # frames to _on_message as raw bytes, skipping websocket-client's
+        # Python UTF-8 check and str decode; the JSON decoder validates them
+        self.ws_thread = threading.Thread(
+            target=self.ws.run_forever,
+            kwargs={"skip_utf8_validation": True},
+            daemon=True
+        )
         self.ws_thread.start()
     
     def disconnect(self):
         """Disconnect from WebSocket server."""
         self._log("Disconnecting...")
         self.running = False
+        self._stop_event.set()
         
         if self.ws:
             self.ws.close()
         
         self.connected = False
+        
+        # Deliver messages already received, then stop the dispatch thread
+        # (unless a callback running on it called disconnect())
+        if self._dispatch_thread:
+            self._messages.put(_STOP)
+            if self._dispatch_thread is not threading.current_thread():
+                self._dispatch_thread.join(timeout=5)
+            self._dispatch_thread = None
     
     def get_orderbook(self, asset_id: str) -> Optional[Dict]:
         """Get current orderbook for an asset."""
-        with self._lock:
-            return self.orderbooks.get(asset_id)
+        return self.orderbooks.get(asset_id)
     
-    def get_recent_trades(self, limit: int = 10) -> List[Dict]:
-        """Get recent trades."""
-        with self._lock:
-            return list(self.trades_history)[:limit]
+    def get_recent_trades(self, limit: int = 10) -> List[TradeRecord]:
+        """Get recent trades (newest first)."""
+        # islice and list run in C without releasing the GIL, so the
+        # snapshot cannot interleave with an appendleft
+        return list(islice(self.trades_history, limit))
     
-    def get_last_price(self, asset_id: str) -> Optional[Dict]:
-        """Get last trade price for an asset."""
-        with self._lock:
-            return self.last_prices.get(asset_id)
+    def get_last_price(self, asset_id: str) -> Optional[TradeRecord]:
+        """Get the last trade for an asset."""
+        return self.last_prices.get(asset_id)
     
     def is_connected(self) -> bool:
         """Check if WebSocket is connected."""
@@ -284,7 +421,7 @@ def test_connection(asset_ids: List[str], duration: int = 30):
     print(f"Subscribing to {len(asset_ids)} asset(s)")
     
     def on_trade(trade):
-        print(f"\n🔔 TRADE: {trade['side']} {trade['size']} @ ${trade['price']}")
+        print(f"\n🔔 TRADE: {trade.side} {trade.size} @ ${trade.price}")
     
     def on_book(book):
         bids = book.get('bids', [])[:3]